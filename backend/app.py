@@ -1,29 +1,64 @@
 # backend/app.py
-import os
+import base64
+import gzip
 import json
-from typing import Any, Dict, List, Optional
+import os
+import sqlite3
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
 
 import httpx
 from dotenv import load_dotenv
-from fastapi import FastAPI, Query, Body, HTTPException
+from fastapi import FastAPI, Query, Body, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
 
+import events
+import http_clients
+import jobs
+import ramps_sync
+import tiles
 from youtube_client import youtube_search
-from cache import read_cache, write_cache
+from cache import cached_at, cached_fetch, cache_stats
+from http_caching import NotModified, Validator, make_etag, not_modified_handler, version_token, versioned
+from ingest import ingest_records, parse_ingest_payload
+from responses import CompressionMiddleware, ORJSONResponse, cached_body, cached_json, iter_json_array, iter_json_columns
 
 from db import (
     init_db,
-    connect,
-    now_iso,
+    init_pool,
+    get_pool,
+    close_pool,
+    read_conn,
+    write_conn,
     upsert_video,
     insert_bait_hits,
-    get_baits_for_video,
+    replace_bait_hits,
+    page_baits_for_video,
+    hit_fields,
+    hits_after,
+    iter_hits,
+    on_hits_committed,
+    enqueue_job,
+    get_job,
+    list_jobs,
+    job_counts,
+    JOB_STATUSES,
+    search_text,
     bait_summary,
+    bait_trends,
+    TREND_BUCKETS,
+    get_geojson_blob,
+    ramps_in_bbox,
+    nearest_ramps,
 )
 
 load_dotenv()
 
-app = FastAPI(title="Rayburn Ranger API")
+app = FastAPI(title="Rayburn Ranger API", default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -31,12 +66,42 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
+# br/gzip over RAYBURN_COMPRESS_MIN_BYTES; cached_body() responses arrive already encoded
+app.add_middleware(CompressionMiddleware)
+
+app.add_exception_handler(NotModified, not_modified_handler)
+
+# Cache-Control max-age (seconds); everything else uses http_caching.DEFAULT_MAX_AGE
+RAMPS_MAX_AGE = 300  # ramps change at most once per background sync
+TILE_MAX_AGE = 60
+
+# NDJSON ingest: longest accepted line, and results kept in memory before spilling to disk
+INGEST_MAX_LINE_BYTES = int(os.getenv("RAYBURN_INGEST_MAX_LINE_BYTES", str(16 * 1024 * 1024)))
+INGEST_RESULTS_SPOOL_BYTES = 1024 * 1024
+
 
 @app.on_event("startup")
-def _startup():
+async def _startup():
     init_db()
+    init_pool()
+    await http_clients.startup()
+    ramps_sync.start_background_sync()
+    jobs.start_workers()
+    broker = events.get_broker()
+    await broker.start()
+    on_hits_committed(broker.notify)
+
+
+@app.on_event("shutdown")
+async def _shutdown():
+    await events.get_broker().stop()
+    await ramps_sync.stop_background_sync()
+    await run_in_threadpool(jobs.stop_workers)
+    await http_clients.shutdown()
+    close_pool()
 
 
 @app.get("/")
@@ -46,10 +111,21 @@ def root():
         "docs": "/docs",
         "endpoints": [
             "/intel/videos",
+            "/intel/cache/stats",
             "/api/ramps",
+            "/api/ramps/nearest",
+            "/api/ramps/sync",
+            "/tiles/{layer}/{z}/{x}/{y}.pbf",
             "/api/videos/{video_id}/baits",
             "/api/baits/summary",
+            "/api/baits/trends",
+            "/api/baits/export",
             "/api/baits/ingest",
+            "/api/baits/ingest/stream",
+            "/api/search?q=",
+            "/api/stream/hits",
+            "/api/jobs",
+            "/api/jobs/{job_id}",
         ],
     }
 
@@ -59,78 +135,161 @@ def root():
 # -------------------------
 @app.get("/intel/videos")
 async def intel_videos(
+    request: Request,
+    response: Response,
     q: str = Query(default="Sam Rayburn fishing"),
     max_results: int = Query(default=12, ge=1, le=50),
     ttl_seconds: int = Query(default=6 * 60 * 60),
+    stale_while_revalidate: bool = Query(default=False),
 ):
     cache_key = f"yt::{q}::{max_results}"
-    cached = read_cache(cache_key, ttl_seconds)
-    if cached is not None:
-        return {"source": "cache", "items": cached}
-
-    raw = await youtube_search(q, max_results)
-    items = []
-
-    for it in raw.get("items", []):
-        vid = it.get("id", {}).get("videoId")
-        sn = it.get("snippet", {})
-        if not vid:
-            continue
-        items.append(
-            {
-                "videoId": vid,
-                "title": sn.get("title"),
-                "channel": sn.get("channelTitle"),
-                "published": sn.get("publishedAt"),
-                "url": f"https://www.youtube.com/watch?v={vid}",
-                "thumbnail": sn.get("thumbnails", {}).get("medium", {}).get("url"),
-            }
-        )
 
-    write_cache(cache_key, items)
-    return {"source": "api", "items": items}
+    async def fetch() -> List[Dict[str, Any]]:
+        raw = await youtube_search(q, max_results)
+        items = []
+
+        for it in raw.get("items", []):
+            vid = it.get("id", {}).get("videoId")
+            sn = it.get("snippet", {})
+            if not vid:
+                continue
+            items.append(
+                {
+                    "videoId": vid,
+                    "title": sn.get("title"),
+                    "channel": sn.get("channelTitle"),
+                    "published": sn.get("publishedAt"),
+                    "url": f"https://www.youtube.com/watch?v={vid}",
+                    "thumbnail": sn.get("thumbnails", {}).get("medium", {}).get("url"),
+                }
+            )
+        return items
+
+    # One upstream call per key no matter how many requests miss at once
+    source, items = await cached_fetch(cache_key, ttl_seconds, fetch, stale_while_revalidate)
+
+    # The cache entry's fetch time is its version; browsers may keep it for the rest of the TTL
+    fetched = cached_at(cache_key) or time.time()
+    v = Validator(make_etag("yt", int(fetched * 1000)), max_age=max(0, int(ttl_seconds - (time.time() - fetched))))
+    v.check(request)
+    v.apply(response)
+    return {"source": source, "items": items}
+
+
+@app.get("/intel/cache/stats")
+def intel_cache_stats():
+    return cache_stats()
 
 
 # -------------------------
-# 2) Ramps from ArcGIS -> GeoJSON
+# 2) Ramps: ArcGIS -> local SQLite (ramps_sync) -> GeoJSON
 # -------------------------
-def _arcgis_geojson_query_url(layer_url: str) -> str:
-    # IMPORTANT: you need the /0 at the end of your FeatureServer URL
-    # Example:
-    # https://services3.arcgis.com/.../arcgis/rest/services/Rayburn_Access_Points/FeatureServer/0
-    params = {
-        "where": "1=1",
-        "outFields": "*",
-        "outSR": "4326",
-        "f": "geojson",
-    }
-    return f"{layer_url}/query"
+@app.get("/api/ramps")
+async def api_ramps(
+    request: Request,
+    bbox: Optional[str] = Query(default=None, description="minLng,minLat,maxLng,maxLat (WGS84)"),
+    limit: int = Query(default=5000, ge=1, le=50000),
+):
+    """
+    Serves the ramps FeatureCollection from SQLite. The body is prebuilt and
+    stored gzip-compressed by the background ArcGIS sync, so gzip-capable
+    clients get it with no re-encoding; the brotli and identity variants are
+    made once per sync and cached. The first call on an empty database
+    syncs inline.
 
+    With ?bbox= only the ramps inside the box are returned (via the spatial index).
+    """
+    box = _parse_bbox(bbox) if bbox else None
 
-@app.get("/api/ramps")
-async def api_ramps():
-    layer_url = os.getenv("RAYBURN_ACCESS_POINTS_LAYER_URL", "").strip()
-    if not layer_url:
-        raise HTTPException(
-            status_code=500,
-            detail="Missing RAYBURN_ACCESS_POINTS_LAYER_URL in backend environment",
-        )
+    resp = await run_in_threadpool(_ramps_response, request, box, limit)
+    if resp is None:
+        await _sync_ramps_or_raise(force=False)
+        resp = await run_in_threadpool(_ramps_response, request, box, limit)
+        if resp is None:
+            raise HTTPException(status_code=502, detail="ArcGIS sync produced no ramps")
+    return resp
 
-    # If user accidentally put FeatureServer without /0, warn early:
-    if layer_url.endswith("/FeatureServer") or layer_url.endswith("/FeatureServer/"):
-        raise HTTPException(
-            status_code=500,
-            detail="RAYBURN_ACCESS_POINTS_LAYER_URL must end with /0 (layer 0), not the service root.",
-        )
 
-    url = _arcgis_geojson_query_url(layer_url)
+def _ramps_response(request: Request, box: Optional[Tuple[float, float, float, float]], limit: int) -> Optional[Response]:
+    """
+    The validator, blob and bbox rows all come from one snapshot, so the ETag
+    always labels the body sent with it (even right after an inline sync).
+    None if nothing has been synced yet.
+    """
+    with get_pool().reader() as conn:
+        conn.execute("BEGIN")
+        blob = get_geojson_blob(conn, "ramps")
+        if blob is None:
+            return None
+        v = Validator(make_etag(version_token(conn, ["ramps"])), max_age=RAMPS_MAX_AGE)
+        v.check(request)
+        if box is not None:
+            return cached_body(request, v, lambda: _ramps_bbox_geojson(conn, box, limit))
+        body_gz = blob["body_gz"]
+        return cached_body(request, v, lambda: gzip.decompress(body_gz), gzip_body=body_gz)
+
+
+def _parse_bbox(bbox: str) -> Tuple[float, float, float, float]:
+    try:
+        min_lng, min_lat, max_lng, max_lat = (float(x) for x in bbox.split(","))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="bbox must be minLng,minLat,maxLng,maxLat")
+    if min_lng > max_lng or min_lat > max_lat:
+        raise HTTPException(status_code=400, detail="bbox min values must not exceed max values")
+    return min_lng, min_lat, max_lng, max_lat
+
+
+def _ramps_bbox_geojson(conn: sqlite3.Connection, box: Tuple[float, float, float, float], limit: int) -> bytes:
+    rows = ramps_in_bbox(conn, *box, limit=limit)
+    features = ",".join(r["raw_json"] for r in rows if r["raw_json"])
+    return ('{"type":"FeatureCollection","features":[' + features + "]}").encode("utf-8")
+
+
+@app.get("/api/ramps/nearest")
+def api_ramps_nearest(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    k: int = Query(default=5, ge=1, le=100),
+    conn: sqlite3.Connection = Depends(read_conn),
+    _v: Validator = Depends(versioned("ramps", max_age=RAMPS_MAX_AGE)),
+):
+    items = nearest_ramps(conn, lat, lng, k=k)
+    for it in items:
+        it.pop("raw_json", None)
+    return {"lat": lat, "lng": lng, "items": items}
+
 
-    async with httpx.AsyncClient(timeout=30) as client:
-        r = await client.get(url, params={"where": "1=1", "outFields": "*", "outSR": "4326", "f": "geojson"})
-        if r.status_code != 200:
-            raise HTTPException(status_code=502, detail=f"ArcGIS query failed: HTTP {r.status_code}")
+@app.post("/api/ramps/sync")
+async def api_ramps_sync(force: bool = Query(default=False)):
+    return await _sync_ramps_or_raise(force=force)
 
-        return r.json()
+
+async def _sync_ramps_or_raise(force: bool) -> Dict[str, Any]:
+    try:
+        return await ramps_sync.sync_ramps(force=force)
+    except ValueError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    except (ramps_sync.RampSyncError, httpx.HTTPError) as e:
+        raise HTTPException(status_code=502, detail=str(e) or "ArcGIS request failed")
+
+
+@app.get("/tiles/{layer}/{z}/{x}/{y}.pbf")
+def api_tile(layer: str, z: int, x: int, y: int, request: Request, conn: sqlite3.Connection = Depends(read_conn)):
+    """
+    Mapbox Vector Tile for `ramps` or `bait_hits` (ramp-linked hit counts).
+    Points are clustered below tiles.CLUSTER_MAX_ZOOM; tiles are cached on
+    disk until the underlying ramps/links/bait_hits change.
+    """
+    if layer not in tiles.LAYERS:
+        raise HTTPException(status_code=404, detail=f"unknown layer {layer!r}; expected one of {sorted(tiles.LAYERS)}")
+    conn.execute("BEGIN")  # tiles.get_tile builds from this same snapshot
+    v = Validator(make_etag(layer, version_token(conn, tiles.LAYERS[layer])), max_age=TILE_MAX_AGE)
+    v.check(request)
+    try:
+        data = tiles.get_tile(conn, layer, z, x, y)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return v.apply(Response(data, media_type="application/vnd.mapbox-vector-tile"))
 
 
 # -------------------------
@@ -138,22 +297,237 @@ async def api_ramps():
 # -------------------------
 
 @app.get("/api/videos/{video_id}/baits")
-def api_get_baits_for_video(video_id: str):
-    with connect() as conn:
-        return {"video_id": video_id, "items": get_baits_for_video(conn, video_id)}
+def api_get_baits_for_video(
+    request: Request,
+    video_id: str,
+    after: Optional[str] = None,
+    limit: int = Query(default=100, ge=1, le=1000),
+    fields: Optional[str] = None,
+    conn: sqlite3.Connection = Depends(read_conn),
+    _v: Validator = Depends(versioned("bait_hits")),
+):
+    """
+    Newest hits first, one page at a time. Pass the returned `next` cursor as
+    ?after= for the following page (null when there are no more). ?fields= is
+    a comma-separated subset of hit fields, e.g. fields=bait_name,t_start.
+    """
+    def build() -> Dict[str, Any]:
+        try:
+            key = _decode_cursor(after) if after else None
+            wanted = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+            items, next_key = page_baits_for_video(conn, video_id, limit=limit, after=key, fields=wanted)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {"video_id": video_id, "items": items, "next": _encode_cursor(next_key) if next_key else None}
+
+    return cached_json(request, _v, build)
+
+
+def _encode_cursor(key: Tuple[Any, ...]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(key, separators=(",", ":")).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[str, int]:
+    try:
+        created_at, hit_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return str(created_at), int(hit_id)
+    except (ValueError, TypeError):
+        raise ValueError("invalid cursor")
+
+
+@app.get("/api/stream/hits")
+async def api_stream_hits(
+    request: Request,
+    video_id: Optional[str] = Query(default=None),
+    bait: Optional[str] = Query(default=None, description="Canonical bait name, e.g. crankbait"),
+    after: Optional[int] = Query(default=None, ge=0, description="Replay hits with hit_id > after first"),
+):
+    """
+    Server-Sent Events stream of newly ingested bait hits (event "hit", id =
+    hit_id, data = the same fields as /api/videos/{video_id}/baits), optionally
+    only for one video and/or bait. Replaces polling the summary/list endpoints.
+
+    On reconnect EventSource sends Last-Event-ID; hits committed since then
+    (up to RAYBURN_SSE_BACKFILL_LIMIT) are replayed before the live ones.
+    """
+    last_event_id = request.headers.get("last-event-id", "").strip()
+    if after is None and last_event_id.isdigit():
+        after = int(last_event_id)
+
+    broker = events.get_broker()
+    try:
+        sub = broker.subscribe(video_id, bait)  # before the backfill so nothing falls in between
+    except events.TooManySubscribers as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    backfill: List[Dict[str, Any]] = []
+    if after is not None:
+        def load() -> List[Dict[str, Any]]:
+            with get_pool().reader() as conn:
+                return hits_after(conn, after, events.SSE_BACKFILL_LIMIT, video_id, bait)
+
+        try:
+            backfill = await run_in_threadpool(load)
+        except BaseException:
+            broker.unsubscribe(sub)
+            raise
+
+    return StreamingResponse(
+        events.stream_hits(broker, sub, backfill, truncated=len(backfill) >= events.SSE_BACKFILL_LIMIT),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/api/search")
+def api_search(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(default=20, ge=1, le=100),
+    conn: sqlite3.Connection = Depends(read_conn),
+    _v: Validator = Depends(versioned("bait_hits", "videos", "transcripts")),
+):
+    """
+    Full-text search over transcript passages and bait-hit snippets, ranked
+    by relevance. Words are ANDed, `word*` matches a prefix, and stemming
+    applies (e.g. "cranking" finds "crank"). Each `text` is HTML-escaped
+    with matches wrapped in <mark>; each result links to its moment in the
+    video when timed.
+    """
+    def build() -> Dict[str, Any]:
+        try:
+            results = search_text(conn, q, limit=limit)
+        except RuntimeError as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        for items in results.values():
+            for r in items:
+                r["url"] = _video_url(r["video_id"], r.get("t_start"))
+        return {"q": q, **results}
+
+    return cached_json(request, _v, build)
+
+
+def _video_url(video_id: str, t_start: Optional[float]) -> str:
+    url = f"https://www.youtube.com/watch?v={video_id}"
+    return f"{url}&t={int(t_start)}s" if t_start is not None else url
 
 
 @app.get("/api/baits/summary")
-def api_bait_summary(limit: int = 25):
-    with connect() as conn:
-        return {"items": bait_summary(conn, limit=limit)}
+def api_bait_summary(
+    request: Request,
+    limit: int = 25,
+    conn: sqlite3.Connection = Depends(read_conn),
+    _v: Validator = Depends(versioned("bait_hits")),
+):
+    return cached_json(request, _v, lambda: {"items": bait_summary(conn, limit=limit)})
+
+
+@app.get("/api/baits/trends")
+def api_bait_trends(
+    request: Request,
+    bucket: str = "week",
+    days: int = Query(default=90, ge=1, le=3660),
+    until: Optional[str] = None,
+    category: Optional[str] = None,
+    channel: Optional[str] = None,
+    ramp_id: Optional[str] = None,
+    bait: Optional[str] = None,
+    limit: int = Query(default=10, ge=1, le=100),
+    conn: sqlite3.Connection = Depends(read_conn),
+    _v: Validator = Depends(versioned("bait_hits", "videos", "links", daily=True)),
+):
+    """
+    Bait mentions over a rolling window of `days` ending at `until`
+    (YYYY-MM-DD, default today UTC), bucketed by day or week (weeks start
+    Monday). A hit is dated by its video's publish date when known.
+    Each series has one point per bucket in the window (zeros included).
+    """
+    if bucket not in TREND_BUCKETS:
+        raise HTTPException(status_code=400, detail=f"bucket must be one of {list(TREND_BUCKETS)}")
+    try:
+        end = date.fromisoformat(until) if until else datetime.now(timezone.utc).date()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="until must be YYYY-MM-DD")
+    start = end - timedelta(days=days - 1)
+
+    labels = []
+    step = start if bucket == "day" else start - timedelta(days=start.weekday())
+    while step <= end:
+        labels.append(step.isoformat())
+        step += timedelta(days=1 if bucket == "day" else 7)
+
+    def build() -> Dict[str, Any]:
+        series = bait_trends(
+            conn,
+            start.isoformat(),
+            end.isoformat(),
+            bucket=bucket,
+            category=category,
+            channel=channel,
+            ramp_id=ramp_id,
+            bait=bait,
+            limit=limit,
+        )
+        zero = {"hits": 0, "videos": 0}
+        for s in series:
+            points = s["points"]
+            s["points"] = [dict(points.get(b, zero), bucket=b) for b in labels]
+
+        # "from" is the first bucket's start (week windows widen to whole weeks)
+        return {"bucket": bucket, "from": labels[0], "to": end.isoformat(), "buckets": labels, "items": series}
+
+    return cached_json(request, _v, build)
+
+
+EXPORT_LAYOUTS = {"objects": iter_json_array, "columns": iter_json_columns}
+
+
+@app.get("/api/baits/export")
+def api_baits_export(
+    layout: str = "objects",
+    video_id: Optional[str] = None,
+    bait: Optional[str] = None,
+    after_id: int = Query(default=0, ge=0),
+    fields: Optional[str] = None,
+):
+    """
+    Every matching hit in hit_id order, streamed from the cursor as a JSON
+    array of objects, or with layout=columns as {"columns": [...], "rows":
+    [[...], ...]} (names sent once). Memory use is flat however many hits
+    match. The download reads one snapshot; to resume an interrupted one,
+    pass the last hit_id received as ?after_id=.
+    """
+    if layout not in EXPORT_LAYOUTS:
+        raise HTTPException(status_code=400, detail=f"layout must be one of {list(EXPORT_LAYOUTS)}")
+    try:
+        wanted = hit_fields([f.strip() for f in fields.split(",") if f.strip()] if fields else None)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    encode = EXPORT_LAYOUTS[layout]
+
+    def body() -> Iterator[bytes]:
+        # holds one pool reader until the client has the last byte (or goes away)
+        with get_pool().reader() as conn:
+            conn.execute("BEGIN")
+            columns, rows = iter_hits(conn, after_id, video_id, bait, wanted)
+            yield from encode(columns, rows)
+
+    return StreamingResponse(body(), media_type="application/json")
 
 
 @app.post("/api/baits/ingest")
-def api_baits_ingest(payload: Dict[str, Any] = Body(...)):
+def api_baits_ingest(
+    payload: Dict[str, Any] = Body(...),
+    replace: bool = False,
+    conn: sqlite3.Connection = Depends(write_conn),
+):
     """
     This is the "bridge" from Whisper output into SQLite.
 
+    Hits are upserted on (video_id, bait, bait_text, t_start), so re-posting
+    a payload is safe. With ?replace=true the payload's hits become the
+    video's complete hit list (old hits are removed in the same transaction).
+
     Expected payload shape (example):
     {
       "video": {
@@ -178,32 +552,179 @@ def api_baits_ingest(payload: Dict[str, Any] = Body(...)):
       ]
     }
     """
-    video = payload.get("video") or {}
-    hits = payload.get("hits") or []
-
-    video_id = (video.get("video_id") or video.get("videoId") or "").strip()
-    if not video_id:
-        raise HTTPException(status_code=400, detail="payload.video.video_id is required")
-
-    # Normalize video fields
-    vrow = {
-        "video_id": video_id,
-        "title": video.get("title"),
-        "channel": video.get("channel") or video.get("channelTitle"),
-        "published": video.get("published") or video.get("publishedAt"),
-        "url": video.get("url"),
-        "thumbnail": video.get("thumbnail"),
-        "source": video.get("source") or "ingest",
-        "created_at": now_iso(),
-    }
+    try:
+        vrow, hits = parse_ingest_payload(payload)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    upsert_video(conn, vrow)
+    n = (replace_bait_hits if replace else insert_bait_hits)(conn, vrow["video_id"], hits)
+    conn.commit()
+
+    return {"ok": True, "video_id": vrow["video_id"], "inserted": n, "replaced": replace}
+
+
+async def _iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, Any]]:
+    """
+    Incrementally splits a byte stream into NDJSON records.
+    Yields (line_number, parsed_record); unparseable lines yield (line_number, ValueError).
+    A line longer than INGEST_MAX_LINE_BYTES ends the request with a 413.
+    """
+    buf = b""
+    lineno = 0
+    async for chunk in chunks:
+        buf += chunk
+        *lines, buf = buf.split(b"\n")
+        for line in lines:
+            lineno += 1
+            _check_line_length(lineno, len(line))
+            if line.strip():
+                yield lineno, _loads_line(line)
+        _check_line_length(lineno + 1, len(buf))
+    if buf.strip():
+        yield lineno + 1, _loads_line(buf)
+
+
+def _check_line_length(lineno: int, size: int) -> None:
+    if size > INGEST_MAX_LINE_BYTES:
+        raise HTTPException(status_code=413, detail=f"line {lineno} is longer than {INGEST_MAX_LINE_BYTES} bytes")
+
+
+def _loads_line(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        return ValueError(f"invalid JSON: {e}")
+
+
+def _ingest_batch(records: List[Tuple[int, Any]], replace: bool = False) -> List[Dict[str, Any]]:
+    """Writes a batch of NDJSON records in one transaction (see ingest.ingest_records)."""
+    with get_pool().writer() as conn:
+        return ingest_records(conn, records, replace)
+
+
+@app.post("/api/baits/ingest/stream")
+async def api_baits_ingest_stream(
+    request: Request,
+    batch_size: int = Query(default=200, ge=1, le=5000),
+    replace: bool = False,
+):
+    """
+    Bulk variant of /api/baits/ingest.
+
+    Body is newline-delimited JSON, one {"video": {...}, "hits": [...]} record
+    per line (same shape as /api/baits/ingest). The body is parsed as it
+    arrives and committed every `batch_size` records, and per-record results
+    spill to a temp file past INGEST_RESULTS_SPOOL_BYTES, so memory stays flat
+    no matter how many videos are sent. A line over INGEST_MAX_LINE_BYTES
+    gets a 413; batches before it stay committed, and re-posting is safe.
+
+    Like /api/baits/ingest, hits are upserted on their natural key and
+    ?replace=true replaces each record's video hits wholesale.
+
+    Response is NDJSON: one {"line", "ok", "video_id", "inserted"} (or "error")
+    result per record, then a final {"done": true, ...} summary line.
+    Per-record results are streamed once the request body has been consumed;
+    uvicorn's ASGI server does not allow reading the body after the response
+    has started.
+    """
+    results = tempfile.SpooledTemporaryFile(max_size=INGEST_RESULTS_SPOOL_BYTES)
+    ok = failed = inserted = 0
+    batch: List[Tuple[int, Any]] = []
+
+    async def flush() -> None:
+        nonlocal ok, failed, inserted
+        for r in await run_in_threadpool(_ingest_batch, batch, replace):
+            if r["ok"]:
+                ok += 1
+                inserted += r["inserted"]
+            else:
+                failed += 1
+            results.write(json.dumps(r).encode("utf-8") + b"\n")
+        batch.clear()
+
+    try:
+        async for lineno, record in _iter_ndjson(request.stream()):
+            batch.append((lineno, record))
+            if len(batch) >= batch_size:
+                await flush()
+        if batch:
+            await flush()
+    except BaseException:
+        results.close()
+        raise
+
+    summary = {"done": True, "ok": ok, "failed": failed, "inserted": inserted}
+    results.write(json.dumps(summary).encode("utf-8") + b"\n")
+    results.seek(0)
+
+    def body() -> Iterator[bytes]:
+        with results:
+            while True:
+                chunk = results.read(64 * 1024)
+                if not chunk:
+                    return
+                yield chunk
+
+    return StreamingResponse(body(), media_type="application/x-ndjson")
 
-    with connect() as conn:
-        upsert_video(conn, vrow)
 
-        if not isinstance(hits, list):
-            raise HTTPException(status_code=400, detail="payload.hits must be a list")
+# -------------------------
+# 4) Background jobs: transcribe / extract / ingest (jobs.py)
+# -------------------------
+@app.post("/api/jobs", status_code=202)
+def api_enqueue_job(
+    body: Dict[str, Any] = Body(...),
+    conn: sqlite3.Connection = Depends(write_conn),
+):
+    """
+    Queues transcribe / extract / ingest work for the job workers and returns
+    immediately; poll GET /api/jobs/{job_id} for progress.
+
+    Body: {"kind": "...", "payload": {...}, "max_attempts": 3}
+      - ingest:     {"records": [{video, hits}, ...], "replace": false}
+                    (same records as /api/baits/ingest)
+      - extract:    {"path": "x.txt", "video_id": "..."} or {"batch": "dir or glob"}
+                    or {"manifest": "list.txt"}; optional "force", "no_cache"
+      - transcribe: {"path": "video.mp4", "video_id": "...", "backend", "model",
+                    "chunk_seconds", "workers"}
+    Paths are read by the workers, so they must exist on the server, inside
+    RAYBURN_JOB_INPUT_DIR (default data/inbox; relative paths start there).
+    """
+    kind = body.get("kind")
+    payload = body.get("payload") or {}
+    max_attempts = body.get("max_attempts", 3)
+    try:
+        jobs.validate_job(kind, payload)
+        if not isinstance(max_attempts, int) or not 1 <= max_attempts <= 10:
+            raise ValueError("max_attempts must be an integer between 1 and 10")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    job_id = enqueue_job(conn, kind, payload, max_attempts=max_attempts)
+    conn.commit()
+    return {"job_id": job_id, "kind": kind, "status": "queued", "url": f"/api/jobs/{job_id}"}
+
+
+@app.get("/api/jobs")
+def api_list_jobs(
+    status: Optional[str] = Query(default=None),
+    limit: int = Query(default=50, ge=1, le=500),
+    conn: sqlite3.Connection = Depends(read_conn),
+):
+    """Recent jobs (newest first), queue depth per status and local worker count."""
+    if status is not None and status not in JOB_STATUSES:
+        raise HTTPException(status_code=400, detail=f"status must be one of {list(JOB_STATUSES)}")
+    return {
+        "counts": job_counts(conn),
+        "workers": jobs.workers_alive(),
+        "items": list_jobs(conn, status, limit),
+    }
 
-        n = insert_bait_hits(conn, video_id, hits)
-        conn.commit()
 
-    return {"ok": True, "video_id": video_id, "inserted": n}
+@app.get("/api/jobs/{job_id}")
+def api_get_job(job_id: int, conn: sqlite3.Connection = Depends(read_conn)):
+    job = get_job(conn, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="job not found")
+    return job
@@ -0,0 +1,149 @@
+# backend/artifacts.py
+"""
+Content-addressed store for pipeline artifacts.
+
+Each artifact lives under ARTIFACT_DIR/<stage>/<key[:2]>/<key><ext>, where key
+is the SHA-256 of the stage name, its version, the input's content hash and
+whatever config the stage output depends on (model, alias table hash, ...).
+A changed input or config therefore simply misses; nothing has to be
+invalidated. Reads bump the file's mtime, and once the store grows past
+ARTIFACT_MAX_BYTES the least recently used files are deleted.
+
+Writes go to a temp file and are renamed into place, so concurrent workers
+(batch mode) never see partial artifacts.
+"""
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+ARTIFACT_DIR = Path(os.getenv("RAYBURN_ARTIFACT_DIR", os.path.join("data", "artifacts")))
+ARTIFACT_MAX_BYTES = int(os.getenv("RAYBURN_ARTIFACT_MAX_BYTES", str(2 * 1024 * 1024 * 1024)))
+
+# Bump a stage's version when its output format or logic changes
+STAGE_VERSIONS: Dict[str, int] = {
+    "audio": 1,  # 16 kHz mono WAV decoded by ffmpeg
+    "segments": 1,  # speech-to-text segments [(t_start, t_end, text)]
+    "extraction": 1,  # bait hits from one transcript
+}
+
+
+def artifact_key(stage: str, input_sha256: str, **config: Any) -> str:
+    material = {"stage": stage, "version": STAGE_VERSIONS[stage], "input": input_sha256, "config": config}
+    return hashlib.sha256(json.dumps(material, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class ArtifactStore:
+    def __init__(self, root: Path = ARTIFACT_DIR, max_bytes: int = ARTIFACT_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._bytes: Optional[int] = None  # running estimate; rescanned on eviction
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def path(self, stage: str, key: str, ext: str) -> Path:
+        return self.root / stage / key[:2] / f"{key}{ext}"
+
+    def get_path(self, stage: str, key: str, ext: str) -> Optional[Path]:
+        """Path of a stored artifact (and marks it recently used), or None."""
+        p = self.path(stage, key, ext)
+        try:
+            os.utime(p)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return p
+
+    @contextmanager
+    def writing(self, stage: str, key: str, ext: str) -> Iterator[Path]:
+        """Yields a temp path to write; it becomes the artifact only if the block succeeds."""
+        p = self.path(stage, key, ext)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        tmp = p.with_name(f"{p.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            yield tmp
+            os.replace(tmp, p)
+        finally:
+            if tmp.exists():
+                tmp.unlink()
+        self._added(p.stat().st_size)
+
+    def get_json(self, stage: str, key: str) -> Optional[Any]:
+        p = self.get_path(stage, key, ".json")
+        if p is None:
+            return None
+        try:
+            return json.loads(p.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def put_json(self, stage: str, key: str, data: Any) -> None:
+        with self.writing(stage, key, ".json") as tmp:
+            tmp.write_text(json.dumps(data, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+
+    # -------------------------
+    # Size bound (LRU by mtime)
+    # -------------------------
+    def _files(self) -> List[Tuple[float, int, Path]]:
+        out: List[Tuple[float, int, Path]] = []
+        if not self.root.exists():
+            return out
+        for p in self.root.rglob("*"):
+            if p.suffix == ".tmp" or not p.is_file():
+                continue
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue  # evicted by another process
+            out.append((st.st_mtime, st.st_size, p))
+        return out
+
+    def _added(self, size: int) -> None:
+        with self._lock:
+            if self._bytes is None:
+                self._bytes = sum(s for _m, s, _p in self._files())
+            else:
+                self._bytes += size
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        files = sorted(self._files())
+        total = sum(s for _m, s, _p in files)
+        for _mtime, size, p in files:
+            if total <= self.max_bytes:
+                break
+            try:
+                p.unlink()
+                self.evictions += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._bytes = total
+
+    def stats(self) -> Dict[str, int]:
+        files = self._files()
+        return {
+            "files": len(files),
+            "bytes": sum(s for _m, s, _p in files),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+_STORE: Optional[ArtifactStore] = None
+
+
+def get_store() -> ArtifactStore:
+    global _STORE
+    if _STORE is None:
+        _STORE = ArtifactStore()
+    return _STORE
@@ -0,0 +1,276 @@
+# backend/audio.py
+"""
+Media -> timestamped transcript segments, without intermediate files.
+
+  ffmpeg (16 kHz mono s16le on stdout)
+    -> split_on_silence(): chunks of <= max_seconds, cut at the quietest
+       frame, with a little overlap on each side
+    -> ProcessPoolExecutor: one speech-to-text model per worker process
+    -> segments (t_start, t_end, text) on the media timeline
+
+Speech-to-text backends are pluggable (see BACKENDS); the heavy packages
+(faster-whisper, openai-whisper) are only imported inside the worker that
+uses them.
+"""
+import os
+import subprocess
+import wave
+from array import array
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from operator import mul
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Protocol, Tuple
+
+SAMPLE_RATE = 16000
+BYTES_PER_SAMPLE = 2  # s16le
+FRAME_SECONDS = 0.03  # energy window used to find silences
+
+Segment = Tuple[float, float, str]
+
+
+@dataclass
+class Chunk:
+    index: int
+    start: float  # media time of the first sample in pcm
+    core_start: float  # segments are kept only if their midpoint is in [core_start, core_end)
+    core_end: float
+    pcm: bytes
+
+
+def stream_pcm(input_path: Path, sample_rate: int = SAMPLE_RATE, block_bytes: int = 1 << 16) -> Iterator[bytes]:
+    """
+    Decodes any media file ffmpeg understands to mono s16le PCM and yields it
+    in blocks straight from the pipe. Requires ffmpeg installed system-wide.
+    """
+    cmd = [
+        "ffmpeg",
+        "-nostdin",
+        "-v",
+        "error",
+        "-i",
+        str(input_path),
+        "-vn",
+        "-ac",
+        "1",
+        "-ar",
+        str(sample_rate),
+        "-f",
+        "s16le",
+        "-acodec",
+        "pcm_s16le",
+        "-",
+    ]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        while True:
+            block = proc.stdout.read(block_bytes)
+            if not block:
+                break
+            yield block
+    finally:
+        proc.stdout.close()
+        err = proc.stderr.read().decode("utf-8", "ignore")
+        proc.stderr.close()
+        if proc.wait() != 0:
+            raise RuntimeError(f"ffmpeg failed ({proc.returncode}): {err.strip()[-500:]}")
+
+
+@lru_cache(maxsize=1)
+def ffmpeg_version() -> str:
+    """First line of `ffmpeg -version` (part of the decoded-audio cache key)."""
+    try:
+        out = subprocess.run(["ffmpeg", "-version"], capture_output=True, text=True, check=False).stdout
+    except FileNotFoundError:
+        return "missing"
+    return out.splitlines()[0].strip() if out else "unknown"
+
+
+def tee_wav(pcm_blocks: Iterable[bytes], path: Path, sample_rate: int = SAMPLE_RATE) -> Iterator[bytes]:
+    """Passes PCM blocks through while also writing them to a mono s16le WAV file."""
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(BYTES_PER_SAMPLE)
+        w.setframerate(sample_rate)
+        for block in pcm_blocks:
+            w.writeframesraw(block)
+            yield block
+
+
+def read_wav(path: Path, block_bytes: int = 1 << 16) -> Iterator[bytes]:
+    """Streams PCM blocks back out of a WAV written by tee_wav()."""
+    with wave.open(str(path), "rb") as w:
+        frames = max(1, block_bytes // (w.getsampwidth() * w.getnchannels()))
+        while True:
+            block = w.readframes(frames)
+            if not block:
+                break
+            yield block
+
+
+def _frame_energies(samples: array, frame: int) -> List[float]:
+    return [sum(map(mul, fr, fr)) / max(1, len(fr)) for fr in (samples[i : i + frame] for i in range(0, len(samples), frame))]
+
+
+def split_on_silence(
+    pcm_blocks: Iterable[bytes],
+    sample_rate: int = SAMPLE_RATE,
+    max_seconds: float = 30.0,
+    min_seconds: float = 10.0,
+    overlap_seconds: float = 0.5,
+) -> Iterator[Chunk]:
+    """
+    Streams PCM into chunks of at most max_seconds (+ overlap). Each cut is
+    placed at the lowest-energy frame between min_seconds and max_seconds so
+    words are rarely split; neighbouring chunks share overlap_seconds of audio
+    on each side of the cut.
+    """
+    frame = int(sample_rate * FRAME_SECONDS)
+    max_n = int(sample_rate * max_seconds)
+    min_n = int(sample_rate * min_seconds)
+    ov = int(sample_rate * overlap_seconds)
+
+    buf = array("h")
+    buf_start = 0  # absolute sample index of buf[0]
+    core_start = 0  # absolute sample index where the current chunk's core begins
+    leftover = b""
+    index = 0
+
+    for block in pcm_blocks:
+        block = leftover + block
+        cut = len(block) - (len(block) % BYTES_PER_SAMPLE)
+        buf.frombytes(block[:cut])
+        leftover = block[cut:]
+
+        while (buf_start + len(buf)) - core_start >= max_n + ov:
+            lo = core_start - buf_start + min_n
+            hi = core_start - buf_start + max_n
+            energies = _frame_energies(buf[lo:hi], frame)
+            quietest = min(range(len(energies)), key=energies.__getitem__)
+            split = lo + quietest * frame + frame // 2  # relative to buf
+
+            end = min(len(buf), split + ov)
+            yield Chunk(
+                index=index,
+                start=buf_start / sample_rate,
+                core_start=core_start / sample_rate,
+                core_end=(buf_start + split) / sample_rate,
+                pcm=buf[:end].tobytes(),
+            )
+            index += 1
+
+            core_start = buf_start + split
+            drop = max(0, split - ov)
+            del buf[:drop]
+            buf_start += drop
+
+    if len(buf) and (buf_start + len(buf)) > core_start:
+        yield Chunk(
+            index=index,
+            start=buf_start / sample_rate,
+            core_start=core_start / sample_rate,
+            core_end=float("inf"),
+            pcm=buf.tobytes(),
+        )
+
+
+# -------------------------
+# Pluggable speech-to-text backends
+# -------------------------
+class Transcriber(Protocol):
+    def transcribe(self, pcm: bytes, sample_rate: int) -> List[Segment]:
+        """Segments relative to the start of `pcm`."""
+        ...
+
+
+class FasterWhisperBackend:
+    def __init__(self, model: str, threads: int):
+        from faster_whisper import WhisperModel
+
+        self.model = WhisperModel(model, device="cpu", compute_type="int8", cpu_threads=threads)
+
+    def transcribe(self, pcm: bytes, sample_rate: int) -> List[Segment]:
+        import numpy as np
+
+        audio = np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+        segments, _info = self.model.transcribe(audio, language="en", vad_filter=False)
+        return [(s.start, s.end, s.text.strip()) for s in segments]
+
+
+class OpenAIWhisperBackend:
+    def __init__(self, model: str, threads: int):
+        import torch
+        import whisper
+
+        torch.set_num_threads(threads)
+        self.model = whisper.load_model(model, device="cpu")
+
+    def transcribe(self, pcm: bytes, sample_rate: int) -> List[Segment]:
+        import numpy as np
+
+        audio = np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+        result = self.model.transcribe(audio, language="en", fp16=False)
+        return [(s["start"], s["end"], s["text"].strip()) for s in result.get("segments", [])]
+
+
+# name -> factory(model, threads)
+BACKENDS: Dict[str, Callable[[str, int], Transcriber]] = {
+    "faster-whisper": FasterWhisperBackend,
+    "whisper": OpenAIWhisperBackend,
+}
+DEFAULT_BACKEND = os.getenv("RAYBURN_STT_BACKEND", "faster-whisper")
+DEFAULT_MODEL = os.getenv("RAYBURN_STT_MODEL", "base.en")
+
+_WORKER: Optional[Transcriber] = None
+
+
+def _init_worker(backend: str, model: str, threads: int) -> None:
+    global _WORKER
+    _WORKER = BACKENDS[backend](model, threads)
+
+
+def _transcribe_chunk(chunk: Chunk) -> List[Segment]:
+    """Worker: transcribe one chunk, shift to media time, keep only its core region."""
+    out: List[Segment] = []
+    for start, end, text in _WORKER.transcribe(chunk.pcm, SAMPLE_RATE):
+        start, end = chunk.start + start, chunk.start + end
+        if text and chunk.core_start <= (start + end) / 2 < chunk.core_end:
+            out.append((round(start, 2), round(end, 2), text))
+    return out
+
+
+def transcribe_media(
+    input_path: Path,
+    workers: int = 2,
+    backend: str = DEFAULT_BACKEND,
+    model: str = DEFAULT_MODEL,
+    max_chunk_seconds: float = 30.0,
+    overlap_seconds: float = 0.5,
+    pcm_blocks: Optional[Iterable[bytes]] = None,
+) -> List[Segment]:
+    """
+    Decode -> chunk -> parallel transcription. Chunks are submitted while
+    ffmpeg is still decoding; at most 2 * workers chunks are in flight so
+    memory stays bounded on long videos. Returns segments sorted by time.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"unknown backend {backend!r}; available: {sorted(BACKENDS)}")
+
+    blocks = pcm_blocks if pcm_blocks is not None else stream_pcm(input_path)
+    threads = max(1, (os.cpu_count() or workers) // workers)
+    segments: List[Segment] = []
+    inflight: List[Future] = []
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(backend, model, threads)) as pool:
+        for chunk in split_on_silence(
+            blocks, max_seconds=max_chunk_seconds, min_seconds=max_chunk_seconds / 3, overlap_seconds=overlap_seconds
+        ):
+            inflight.append(pool.submit(_transcribe_chunk, chunk))
+            if len(inflight) >= 2 * workers:
+                segments.extend(inflight.pop(0).result())
+        for fut in inflight:
+            segments.extend(fut.result())
+
+    segments.sort(key=lambda s: s[0])
+    return segments
@@ -1,7 +1,10 @@
 # backend/baits.py
 from __future__ import annotations
 
-from typing import Dict, List, Tuple
+import hashlib
+import json
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 import re
 
 # 1) Taxonomy: slug -> canonical + category
@@ -54,3 +57,124 @@ def iter_alias_pairs() -> List[Tuple[str, str]]:
         for a in aliases:
             pairs.append((slug, normalize_text(a)))
     return pairs
+
+
+def alias_versions() -> Dict[str, str]:
+    """slug -> hash of its (normalized) alias list; a slug's hash changes when any of its aliases do."""
+    out: Dict[str, str] = {}
+    for slug, aliases in BAIT_ALIASES.items():
+        norm = sorted({normalize_text(a) for a in aliases})
+        out[slug] = hashlib.sha256(json.dumps(norm).encode("utf-8")).hexdigest()[:16]
+    return out
+
+
+def alias_table_hash() -> str:
+    """Fingerprint of the whole alias table; changes whenever any alias is added, removed or edited."""
+    return hashlib.sha256(json.dumps(alias_versions(), sort_keys=True).encode("utf-8")).hexdigest()
+
+
+# 3) Compiled alias matcher (Aho-Corasick) — one linear pass per transcript
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum()
+
+
+class AliasMatcher:
+    """
+    Multi-pattern matcher over normalized text.
+
+    Built once from (slug, alias) pairs; find_all() walks the text a single
+    time and reports every alias occurrence as (start, end, slug, alias),
+    skipping matches that sit inside a longer word ("trap" in "trapped").
+    """
+
+    def __init__(self, pairs: Iterable[Tuple[str, str]]):
+        # goto[node] maps char -> child node; fail/out are per node
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        self.patterns: List[Tuple[str, str]] = []
+
+        seen = set()
+        for slug, alias in pairs:
+            alias = normalize_text(alias)
+            if not alias or (slug, alias) in seen:
+                continue
+            seen.add((slug, alias))
+            self._add(len(self.patterns), alias)
+            self.patterns.append((slug, alias))
+
+        self._build_links()
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def _add(self, idx: int, alias: str) -> None:
+        node = 0
+        for ch in alias:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append(idx)
+
+    def _build_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                target = self._goto[f].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                # inherit outputs of the fallback state (suffix matches)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def find_all(self, text: str) -> Iterator[Tuple[int, int, str, str]]:
+        """
+        Yields (start, end, slug, alias) for every whole-word alias occurrence
+        in `text` (expected to be normalized already). Overlapping aliases
+        ("rattle trap" / "trap") are all reported.
+        """
+        goto, fail, out, patterns = self._goto, self._fail, self._out, self.patterns
+        n = len(text)
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if not out[node]:
+                continue
+            end = i + 1
+            if end < n and _is_word_char(text[end]):
+                continue
+            for idx in out[node]:
+                slug, alias = patterns[idx]
+                start = end - len(alias)
+                if start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                yield start, end, slug, alias
+
+
+_MATCHER: Optional[AliasMatcher] = None
+
+
+def get_alias_matcher() -> AliasMatcher:
+    """
+    Shared matcher for BAIT_ALIASES, compiled on first use and reused.
+    Call reset_alias_matcher() after mutating BAIT_ALIASES at runtime.
+    """
+    global _MATCHER
+    if _MATCHER is None:
+        _MATCHER = AliasMatcher(iter_alias_pairs())
+    return _MATCHER
+
+
+def reset_alias_matcher() -> None:
+    global _MATCHER
+    _MATCHER = None
@@ -1,31 +1,225 @@
+import asyncio
 import json
+import os
+import threading
 import time
+from collections import OrderedDict
 from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
 
 CACHE_DIR = Path(__file__).parent / ".cache"
 CACHE_DIR.mkdir(exist_ok=True)
 
+# In-process tier in front of CACHE_DIR (the warm, persistent tier)
+MEM_MAX_ENTRIES = int(os.getenv("RAYBURN_CACHE_MAX_ENTRIES", "256"))
+MEM_MAX_BYTES = int(os.getenv("RAYBURN_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+MEM_TTL_SECONDS = int(os.getenv("RAYBURN_CACHE_MEM_TTL", str(6 * 60 * 60)))
+
+
+class LRUCache:
+    """
+    Bounded in-memory LRU. Each entry carries its original cached_at (so the
+    caller's ttl_seconds is honoured exactly like the file tier), its own
+    expiry (counted from when it was put, so a copy promoted from disk gets a
+    full memory lifetime), and an approximate size (length of its JSON encoding).
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data: "OrderedDict[str, Tuple[Any, float, float, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str, ttl_seconds: int) -> Optional[Tuple[Any, float]]:
+        """Returns (data, cached_at) or None; counts a hit/miss."""
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            data, cached_at, expires_at, _size = entry
+            if now >= expires_at:
+                self._drop(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            if now - cached_at > ttl_seconds:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return data, cached_at
+
+    def peek(self, key: str) -> Optional[Tuple[Any, float]]:
+        """Like get() but ignores TTLs and leaves the counters alone."""
+        with self._lock:
+            entry = self._data.get(key)
+            return (entry[0], entry[1]) if entry else None
+
+    def put(self, key: str, data: Any, cached_at: float, size: int, ttl_seconds: int) -> None:
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._data:
+                self._drop(key)
+            self._data[key] = (data, cached_at, time.time() + ttl_seconds, size)
+            self._bytes += size
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._data))
+                self._drop(oldest)
+                self.evictions += 1
+
+    def _drop(self, key: str) -> None:
+        _data, _cached_at, _expires_at, size = self._data.pop(key)
+        self._bytes -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+MEMORY = LRUCache(MEM_MAX_ENTRIES, MEM_MAX_BYTES)
+_disk_stats = {"disk_hits": 0, "disk_misses": 0, "disk_writes": 0}
+
 
 def cache_path(key: str) -> Path:
     safe = "".join(ch if ch.isalnum() else "_" for ch in key.lower())
     return CACHE_DIR / f"{safe}.json"
 
 
-def read_cache(key: str, ttl_seconds: int):
+def _read_disk(key: str) -> Optional[Tuple[Any, float, int]]:
     p = cache_path(key)
-    if not p.exists():
-        return None
     try:
-        payload = json.loads(p.read_text(encoding="utf-8"))
-        age = time.time() - payload.get("_cached_at", 0)
-        if age > ttl_seconds:
-            return None
-        return payload.get("data")
+        raw = p.read_text(encoding="utf-8")
+        payload = json.loads(raw)
+        return payload.get("data"), float(payload.get("_cached_at", 0)), len(raw)
     except Exception:
         return None
 
 
+def read_cache(key: str, ttl_seconds: int):
+    found = MEMORY.get(key, ttl_seconds)
+    if found is not None:
+        return found[0]
+
+    disk = _read_disk(key)
+    if disk is None:
+        _disk_stats["disk_misses"] += 1
+        return None
+    data, cached_at, size = disk
+    if time.time() - cached_at > ttl_seconds:
+        _disk_stats["disk_misses"] += 1
+        return None
+    _disk_stats["disk_hits"] += 1
+    MEMORY.put(key, data, cached_at, size, MEM_TTL_SECONDS)
+    return data
+
+
 def write_cache(key: str, data):
-    p = cache_path(key)
-    payload = {"_cached_at": time.time(), "data": data}
-    p.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    cached_at = time.time()
+    payload = {"_cached_at": cached_at, "data": data}
+    raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+    MEMORY.put(key, data, cached_at, len(raw), MEM_TTL_SECONDS)
+    cache_path(key).write_text(raw, encoding="utf-8")
+    _disk_stats["disk_writes"] += 1
+
+
+def read_stale(key: str) -> Optional[Tuple[Any, float]]:
+    """Returns (data, cached_at) for the newest copy of key, however old."""
+    found = MEMORY.peek(key)
+    if found is not None:
+        return found
+    disk = _read_disk(key)
+    return (disk[0], disk[1]) if disk else None
+
+
+def cached_at(key: str) -> Optional[float]:
+    """When the current copy of key was fetched (its version), or None."""
+    found = read_stale(key)
+    return found[1] if found else None
+
+
+def cache_stats() -> Dict[str, int]:
+    return {**MEMORY.stats(), **_disk_stats, **_flight_stats, "inflight": len(_INFLIGHT)}
+
+
+# -------------------------
+# Single-flight fetches for cache misses
+# -------------------------
+_INFLIGHT: Dict[str, "asyncio.Future[Any]"] = {}
+_flight_stats = {"fetches": 0, "coalesced": 0, "stale_served": 0}
+
+
+async def _fetch_and_store(key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+    _flight_stats["fetches"] += 1
+    data = await fetch()
+    write_cache(key, data)
+    return data
+
+
+def _start_flight(key: str, fetch: Callable[[], Awaitable[Any]]) -> "asyncio.Future[Any]":
+    fut = _INFLIGHT.get(key)
+    if fut is not None:
+        _flight_stats["coalesced"] += 1
+        return fut
+
+    fut = asyncio.ensure_future(_fetch_and_store(key, fetch))
+    _INFLIGHT[key] = fut
+
+    def _done(f: "asyncio.Future[Any]") -> None:
+        if _INFLIGHT.get(key) is f:
+            del _INFLIGHT[key]
+        if not f.cancelled():
+            f.exception()  # mark retrieved; awaiting callers still see it
+
+    fut.add_done_callback(_done)
+    return fut
+
+
+async def cached_fetch(
+    key: str,
+    ttl_seconds: int,
+    fetch: Callable[[], Awaitable[Any]],
+    stale_while_revalidate: bool = False,
+) -> Tuple[str, Any]:
+    """
+    Cache read with request coalescing. Returns (source, data) where source is
+    "cache", "api" or "stale".
+
+    On a miss only one fetch() runs per key; concurrent callers await the same
+    result. With stale_while_revalidate, an expired entry is returned at once
+    while a single background fetch refreshes it.
+    """
+    cached = read_cache(key, ttl_seconds)
+    if cached is not None:
+        return "cache", cached
+
+    if stale_while_revalidate:
+        stale = read_stale(key)
+        if stale is not None:
+            _start_flight(key, fetch)
+            _flight_stats["stale_served"] += 1
+            return "stale", stale[0]
+
+    # shield: a cancelled caller must not cancel the fetch other callers share
+    return "api", await asyncio.shield(_start_flight(key, fetch))
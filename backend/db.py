@@ -1,27 +1,176 @@
 # backend/db.py
+import gzip
+import html
+import json
+import logging
+import math
 import os
 import sqlite3
+import threading
 from contextlib import contextmanager
-from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, Tuple
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 DB_PATH = os.getenv("RAYBURN_DB_PATH", os.path.join("data", "rayburn.db"))
 
+log = logging.getLogger(__name__)
+
 
 def now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
-def connect() -> sqlite3.Connection:
-    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
+# Tuned once per connection (see _configure); override via env for big boxes
+DB_MMAP_SIZE = int(os.getenv("RAYBURN_DB_MMAP_SIZE", str(256 * 1024 * 1024)))
+DB_CACHE_KB = int(os.getenv("RAYBURN_DB_CACHE_KB", str(64 * 1024)))
+DB_MAX_READERS = int(os.getenv("RAYBURN_DB_MAX_READERS", "16"))
+STREAM_BATCH_ROWS = int(os.getenv("RAYBURN_STREAM_BATCH_ROWS", "1000"))
+
+
+def _configure(conn: sqlite3.Connection, readonly: bool = False) -> sqlite3.Connection:
     conn.row_factory = sqlite3.Row
     # Safer concurrency for local dev
     conn.execute("PRAGMA journal_mode=WAL;")
     conn.execute("PRAGMA foreign_keys=ON;")
+    conn.execute("PRAGMA synchronous=NORMAL;")
+    conn.execute("PRAGMA busy_timeout=5000;")
+    conn.execute(f"PRAGMA mmap_size={DB_MMAP_SIZE};")
+    conn.execute(f"PRAGMA cache_size=-{DB_CACHE_KB};")
+    conn.execute("PRAGMA temp_store=MEMORY;")
+    if readonly:
+        conn.execute("PRAGMA query_only=ON;")
     return conn
 
 
+def connect() -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+    return _configure(sqlite3.connect(DB_PATH))
+
+
+class ConnectionPool:
+    """
+    Long-lived connections for the API process:
+      - readers: one per concurrently running request (bounded by the worker
+        threadpool), opened lazily and reused; each checkout is exclusive
+      - writer: a single connection; writes are serialized through a lock
+
+    Connections are created with check_same_thread=False because FastAPI may
+    run a dependency and its handler on different threadpool threads; the
+    checkout/lock discipline above keeps each one in single use.
+    """
+
+    def __init__(self, path: str = DB_PATH, max_readers: int = DB_MAX_READERS):
+        self.path = path
+        self.max_readers = max_readers
+        self._idle: List[sqlite3.Connection] = []
+        self._all_readers: List[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+        self._readers_free = threading.Semaphore(max_readers)
+        self._write_lock = threading.Lock()
+        self._writer: Optional[sqlite3.Connection] = None
+
+    def _open(self, readonly: bool = False) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        return _configure(conn, readonly=readonly)
+
+    def open(self) -> "ConnectionPool":
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._writer = self._open()
+        return self
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        self._readers_free.acquire()
+        with self._readers_lock:
+            conn = self._idle.pop() if self._idle else None
+        if conn is None:
+            conn = self._open(readonly=True)
+            with self._readers_lock:
+                self._all_readers.append(conn)
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            with self._readers_lock:
+                self._idle.append(conn)
+            self._readers_free.release()
+
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        if self._writer is None:
+            raise RuntimeError("connection pool is not open")
+        with self._write_lock:
+            conn = self._writer
+            try:
+                yield conn
+                conn.commit()
+            except BaseException:
+                rollback(conn)
+                _HITS_WRITTEN.discard(id(conn))
+                raise
+            if id(conn) in _HITS_WRITTEN:
+                _HITS_WRITTEN.discard(id(conn))
+                for fn in _HIT_LISTENERS:
+                    fn()
+
+    def close(self) -> None:
+        with self._readers_lock:
+            for conn in self._all_readers:
+                conn.close()
+            self._all_readers.clear()
+            self._idle.clear()
+        with self._write_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+
+_POOL: Optional[ConnectionPool] = None
+
+
+def init_pool() -> ConnectionPool:
+    global _POOL
+    if _POOL is None:
+        _POOL = ConnectionPool().open()
+    return _POOL
+
+
+def get_pool() -> ConnectionPool:
+    if _POOL is None:
+        raise RuntimeError("connection pool is not initialized; call init_pool() at startup")
+    return _POOL
+
+
+def close_pool() -> None:
+    global _POOL
+    if _POOL is not None:
+        _POOL.close()
+        _POOL = None
+
+
+# FastAPI dependencies: Depends(read_conn) / Depends(write_conn)
+def read_conn() -> Iterator[sqlite3.Connection]:
+    with get_pool().reader() as conn:
+        yield conn
+
+
+def write_conn() -> Iterator[sqlite3.Connection]:
+    with get_pool().writer() as conn:
+        yield conn
+
+
+# Called (from the writing thread) after a pool write that inserted bait hits
+# has committed; events.py uses it to push new hits to SSE subscribers.
+_HIT_LISTENERS: List[Callable[[], None]] = []
+_HITS_WRITTEN: Set[int] = set()  # id() of connections with uncommitted hit inserts
+
+
+def on_hits_committed(fn: Callable[[], None]) -> None:
+    if fn not in _HIT_LISTENERS:
+        _HIT_LISTENERS.append(fn)
+
+
 def init_db() -> None:
     """
     Creates tables if they don't exist.
@@ -83,12 +232,475 @@ def init_db() -> None:
               FOREIGN KEY(bait_id) REFERENCES baits(bait_id) ON DELETE CASCADE
             );
 
-            CREATE INDEX IF NOT EXISTS idx_bait_hits_video ON bait_hits(video_id);
+            -- per-video listing in created_at order (keyset pagination); also serves video_id lookups
+            CREATE INDEX IF NOT EXISTS idx_bait_hits_video_created ON bait_hits(video_id, created_at, hit_id);
             CREATE INDEX IF NOT EXISTS idx_bait_hits_bait ON bait_hits(bait_id);
             CREATE INDEX IF NOT EXISTS idx_links_video ON links(video_id);
             CREATE INDEX IF NOT EXISTS idx_links_ramp ON links(ramp_id);
+
+            -- transcripts that have been extracted, keyed by video; content_sha256
+            -- lets batch runs skip files that were already ingested, and the stored
+            -- text + packed cue index let --reextract rescan without the source files
+            CREATE TABLE IF NOT EXISTS transcripts (
+              video_id TEXT PRIMARY KEY,
+              content_sha256 TEXT NOT NULL,
+              source TEXT,
+              text TEXT,
+              cues BLOB,
+              created_at TEXT NOT NULL,
+              FOREIGN KEY(video_id) REFERENCES videos(video_id) ON DELETE CASCADE
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_transcripts_sha ON transcripts(content_sha256);
+
+            -- bookkeeping for upstream syncs (e.g. ArcGIS ramps)
+            CREATE TABLE IF NOT EXISTS sync_state (
+              name TEXT PRIMARY KEY,
+              etag TEXT,
+              last_edit INTEGER,           -- upstream lastEditDate (epoch ms)
+              synced_at TEXT,
+              checked_at TEXT
+            );
+
+            -- prebuilt, gzip-compressed response bodies
+            CREATE TABLE IF NOT EXISTS geojson_blobs (
+              name TEXT PRIMARY KEY,
+              body_gz BLOB NOT NULL,
+              feature_count INTEGER NOT NULL,
+              built_at TEXT NOT NULL
+            );
+
+            -- monotonically increasing per-dataset counters, bumped on writes;
+            -- used to invalidate derived artifacts (tile cache, HTTP ETags, ...)
+            CREATE TABLE IF NOT EXISTS data_versions (
+              name TEXT PRIMARY KEY,
+              version INTEGER NOT NULL DEFAULT 0
+            );
+
+            -- per-slug alias hashes the stored transcript hits were extracted with
+            CREATE TABLE IF NOT EXISTS alias_versions (
+              slug TEXT PRIMARY KEY,
+              alias_hash TEXT NOT NULL,
+              updated_at TEXT NOT NULL
+            );
+
+            -- background work queue (see jobs.py); a worker holds a job only while
+            -- its lease is fresh, so jobs of a crashed worker become claimable again
+            CREATE TABLE IF NOT EXISTS jobs (
+              job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+              kind TEXT NOT NULL,          -- transcribe | extract | ingest
+              payload TEXT NOT NULL,       -- JSON
+              status TEXT NOT NULL DEFAULT 'queued',  -- queued | running | done | failed
+              attempts INTEGER NOT NULL DEFAULT 0,
+              max_attempts INTEGER NOT NULL DEFAULT 3,
+              worker TEXT,
+              lease_until REAL,            -- epoch seconds
+              progress_done INTEGER NOT NULL DEFAULT 0,
+              progress_total INTEGER,
+              result TEXT,                 -- JSON
+              error TEXT,
+              created_at TEXT NOT NULL,
+              started_at TEXT,
+              finished_at TEXT
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, job_id);
+            """
+        )
+        _migrate(conn)
+        _init_hit_key(conn)
+        _init_bait_stats(conn)
+        _init_spatial_index(conn)
+        _init_search_index(conn)
+
+
+def table_has_column(conn: sqlite3.Connection, table: str, column: str) -> bool:
+    # PRAGMA table_info returns: (cid, name, type, notnull, dflt_value, pk)
+    return any(row[1] == column for row in conn.execute(f"PRAGMA table_info({table})"))
+
+
+def _migrate(conn: sqlite3.Connection) -> None:
+    """Schema changes after a table first shipped (SQLite has no ADD COLUMN IF NOT EXISTS)."""
+    for table, column, decl in (
+        ("transcripts", "text", "TEXT"),
+        ("transcripts", "cues", "BLOB"),
+    ):
+        if not table_has_column(conn, table, column):
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+    # superseded by idx_bait_hits_video_created
+    conn.execute("DROP INDEX IF EXISTS idx_bait_hits_video")
+
+
+# Natural key of a bait hit. NULLs are folded so they compare equal in the
+# unique index; the ON CONFLICT target must repeat these exact expressions.
+_HIT_KEY = "video_id, bait_id, COALESCE(bait_text, ''), COALESCE(t_start, -1.0)"
+
+
+def _init_hit_key(conn: sqlite3.Connection) -> None:
+    """Dedupes existing hits (keeping the newest row per key), then enforces the natural key."""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'ux_bait_hits_natural'"
+    ).fetchone()
+    if exists:
+        return
+    cur = conn.execute(f"DELETE FROM bait_hits WHERE hit_id NOT IN (SELECT MAX(hit_id) FROM bait_hits GROUP BY {_HIT_KEY})")
+    if cur.rowcount:
+        log.info("Removed %d duplicate bait_hits rows", cur.rowcount)
+        bump_version(conn, "bait_hits")
+    conn.execute(f"CREATE UNIQUE INDEX ux_bait_hits_natural ON bait_hits({_HIT_KEY})")
+
+
+# A hit's trend day: the video's publish date when known (the day it was
+# fished), else the day the hit was recorded
+_ISO_DAY_GLOB = "'[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]*'"
+_HIT_DAY = f"""COALESCE(
+    (SELECT substr(published, 1, 10) FROM videos WHERE video_id = NEW.video_id AND published GLOB {_ISO_DAY_GLOB}),
+    substr(NEW.created_at, 1, 10))"""
+
+# Trigger bodies keeping bait_stats / bait_daily in step with one bait_hits row coming or going
+_STATS_ADD = f"""
+  INSERT INTO bait_video_hits(bait_id, video_id, hits) VALUES (NEW.bait_id, NEW.video_id, 1)
+    ON CONFLICT(bait_id, video_id) DO UPDATE SET hits = hits + 1;
+  INSERT INTO bait_stats(bait_id, hits, videos, last_seen) VALUES (NEW.bait_id, 1, 1, NEW.created_at)
+    ON CONFLICT(bait_id) DO UPDATE SET
+      hits = hits + 1,
+      videos = videos + (SELECT hits = 1 FROM bait_video_hits WHERE bait_id = NEW.bait_id AND video_id = NEW.video_id),
+      last_seen = MAX(COALESCE(last_seen, ''), excluded.last_seen);
+  INSERT INTO bait_daily(day, bait_id, video_id, hits) VALUES ({_HIT_DAY}, NEW.bait_id, NEW.video_id, 1)
+    ON CONFLICT(day, bait_id, video_id) DO UPDATE SET hits = hits + 1;
+"""
+# The delete side can't recompute the day (the video row may already be gone
+# in an FK cascade), so it decrements the hit's recorded day if that row
+# exists, else whichever day the (bait, video) pair was filed under.
+_STATS_REMOVE = """
+  UPDATE bait_video_hits SET hits = hits - 1 WHERE bait_id = OLD.bait_id AND video_id = OLD.video_id;
+  UPDATE bait_stats SET
+    hits = hits - 1,
+    videos = videos - (SELECT hits = 0 FROM bait_video_hits WHERE bait_id = OLD.bait_id AND video_id = OLD.video_id)
+  WHERE bait_id = OLD.bait_id;
+  DELETE FROM bait_video_hits WHERE bait_id = OLD.bait_id AND video_id = OLD.video_id AND hits <= 0;
+  UPDATE bait_daily SET hits = hits - 1
+  WHERE bait_id = OLD.bait_id AND video_id = OLD.video_id AND day = (
+    SELECT day FROM bait_daily WHERE bait_id = OLD.bait_id AND video_id = OLD.video_id
+    ORDER BY day = substr(OLD.created_at, 1, 10) DESC LIMIT 1
+  );
+  DELETE FROM bait_daily WHERE bait_id = OLD.bait_id AND video_id = OLD.video_id AND hits <= 0;
+"""
+
+
+def _init_bait_stats(conn: sqlite3.Connection) -> None:
+    """
+    bait_stats is a materialized per-bait aggregate (hits, distinct videos,
+    last_seen) maintained by triggers on bait_hits, so bait_summary reads N
+    rows instead of grouping every hit. bait_video_hits holds the per
+    (bait, video) counts needed to keep the distinct-video count exact.
+    last_seen is the newest hit ever recorded; it does not move back on deletes.
+
+    bait_daily is the same per (bait, video) count filed under a day, for
+    bait_trends; when a video's publish date changes its rows are refiled.
+    bait_day_totals / bait_week_totals roll bait_daily up per (day|week, bait)
+    via triggers on bait_daily.
+    """
+    rollups = ("bait_stats", "bait_daily", "bait_day_totals", "bait_week_totals")
+    existing = {
+        r[0]
+        for r in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name IN (SELECT value FROM json_each(?))",
+            (json.dumps(rollups),),
+        )
+    }
+    conn.executescript(
+        f"""
+        CREATE TABLE IF NOT EXISTS bait_stats (
+          bait_id INTEGER PRIMARY KEY,
+          hits INTEGER NOT NULL DEFAULT 0,
+          videos INTEGER NOT NULL DEFAULT 0,
+          last_seen TEXT,
+          FOREIGN KEY(bait_id) REFERENCES baits(bait_id) ON DELETE CASCADE
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_bait_stats_hits ON bait_stats(hits DESC);
+
+        CREATE TABLE IF NOT EXISTS bait_video_hits (
+          bait_id INTEGER NOT NULL,
+          video_id TEXT NOT NULL,
+          hits INTEGER NOT NULL,
+          PRIMARY KEY(bait_id, video_id)
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS bait_daily (
+          day TEXT NOT NULL,           -- YYYY-MM-DD
+          bait_id INTEGER NOT NULL,
+          video_id TEXT NOT NULL,
+          hits INTEGER NOT NULL,
+          PRIMARY KEY(day, bait_id, video_id)
+        ) WITHOUT ROWID;
+
+        CREATE INDEX IF NOT EXISTS idx_bait_daily_video ON bait_daily(video_id, bait_id);
+
+        -- bait_daily summed over videos, per day and per week (Monday): what
+        -- trend queries without a channel/ramp filter read, with no GROUP BY
+        CREATE TABLE IF NOT EXISTS bait_day_totals (
+          day TEXT NOT NULL,
+          bait_id INTEGER NOT NULL,
+          hits INTEGER NOT NULL,
+          videos INTEGER NOT NULL,
+          PRIMARY KEY(day, bait_id)
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS bait_week_totals (
+          week TEXT NOT NULL,
+          bait_id INTEGER NOT NULL,
+          hits INTEGER NOT NULL,
+          videos INTEGER NOT NULL,
+          PRIMARY KEY(week, bait_id)
+        ) WITHOUT ROWID;
+
+        CREATE INDEX IF NOT EXISTS idx_videos_channel ON videos(channel);
+
+        CREATE TRIGGER IF NOT EXISTS bait_totals_ai AFTER INSERT ON bait_daily
+        BEGIN
+          INSERT INTO bait_day_totals(day, bait_id, hits, videos) VALUES (NEW.day, NEW.bait_id, NEW.hits, 1)
+            ON CONFLICT(day, bait_id) DO UPDATE SET hits = hits + excluded.hits, videos = videos + 1;
+          INSERT INTO bait_week_totals(week, bait_id, hits, videos)
+            VALUES (date(NEW.day, 'weekday 0', '-6 days'), NEW.bait_id, NEW.hits, 1)
+            ON CONFLICT(week, bait_id) DO UPDATE SET hits = hits + excluded.hits, videos = videos + 1;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS bait_totals_au AFTER UPDATE OF hits ON bait_daily
+        BEGIN
+          UPDATE bait_day_totals SET hits = hits + NEW.hits - OLD.hits WHERE day = NEW.day AND bait_id = NEW.bait_id;
+          UPDATE bait_week_totals SET hits = hits + NEW.hits - OLD.hits
+          WHERE week = date(NEW.day, 'weekday 0', '-6 days') AND bait_id = NEW.bait_id;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS bait_totals_ad AFTER DELETE ON bait_daily
+        BEGIN
+          UPDATE bait_day_totals SET hits = hits - OLD.hits, videos = videos - 1
+          WHERE day = OLD.day AND bait_id = OLD.bait_id;
+          DELETE FROM bait_day_totals WHERE day = OLD.day AND bait_id = OLD.bait_id AND videos <= 0;
+          UPDATE bait_week_totals SET hits = hits - OLD.hits, videos = videos - 1
+          WHERE week = date(OLD.day, 'weekday 0', '-6 days') AND bait_id = OLD.bait_id;
+          DELETE FROM bait_week_totals
+          WHERE week = date(OLD.day, 'weekday 0', '-6 days') AND bait_id = OLD.bait_id AND videos <= 0;
+        END;
+
+        -- recreated on every start so changes to the trigger bodies reach existing databases
+        DROP TRIGGER IF EXISTS bait_stats_ai;
+        DROP TRIGGER IF EXISTS bait_stats_ad;
+        DROP TRIGGER IF EXISTS bait_stats_au;
+
+        CREATE TRIGGER bait_stats_ai AFTER INSERT ON bait_hits
+        BEGIN {_STATS_ADD}
+        END;
+
+        CREATE TRIGGER bait_stats_ad AFTER DELETE ON bait_hits
+        BEGIN {_STATS_REMOVE}
+        END;
+
+        CREATE TRIGGER bait_stats_au AFTER UPDATE OF bait_id, video_id ON bait_hits
+        BEGIN {_STATS_REMOVE} {_STATS_ADD}
+        END;
+
+        DROP TRIGGER IF EXISTS bait_daily_published;
+
+        CREATE TRIGGER bait_daily_published AFTER UPDATE OF published ON videos
+        WHEN NEW.published IS NOT OLD.published
+        BEGIN
+          DELETE FROM bait_daily WHERE video_id = NEW.video_id;
+          INSERT INTO bait_daily(day, bait_id, video_id, hits)
+            SELECT
+              CASE WHEN NEW.published GLOB {_ISO_DAY_GLOB} THEN substr(NEW.published, 1, 10)
+                   ELSE substr(created_at, 1, 10) END AS day,
+              bait_id, video_id, COUNT(*)
+            FROM bait_hits WHERE video_id = NEW.video_id
+            GROUP BY day, bait_id;
+        END;
+        """
+    )
+    if len(existing) < len(rollups):
+        rebuild_bait_stats(conn)
+
+
+def rebuild_bait_stats(conn: sqlite3.Connection) -> None:
+    """Recomputes the bait_hits rollups (backfill or repair); the day/week totals follow via triggers."""
+    conn.execute("DELETE FROM bait_video_hits")
+    conn.execute("DELETE FROM bait_stats")
+    conn.execute("DELETE FROM bait_daily")
+    conn.execute("DELETE FROM bait_day_totals")
+    conn.execute("DELETE FROM bait_week_totals")
+    conn.execute(
+        """
+        INSERT INTO bait_video_hits(bait_id, video_id, hits)
+          SELECT bait_id, video_id, COUNT(*) FROM bait_hits GROUP BY bait_id, video_id
+        """
+    )
+    conn.execute(
+        """
+        INSERT INTO bait_stats(bait_id, hits, videos, last_seen)
+          SELECT bait_id, COUNT(*), COUNT(DISTINCT video_id), MAX(created_at) FROM bait_hits GROUP BY bait_id
+        """
+    )
+    conn.execute(
+        f"""
+        INSERT INTO bait_daily(day, bait_id, video_id, hits)
+          SELECT
+            CASE WHEN v.published GLOB {_ISO_DAY_GLOB} THEN substr(v.published, 1, 10)
+                 ELSE substr(bh.created_at, 1, 10) END AS day,
+            bh.bait_id, bh.video_id, COUNT(*)
+          FROM bait_hits bh
+          LEFT JOIN videos v ON v.video_id = bh.video_id
+          GROUP BY day, bh.bait_id, bh.video_id
+        """
+    )
+
+
+def _init_spatial_index(conn: sqlite3.Connection) -> None:
+    """
+    ramps_rtree mirrors ramps(lat, lng) keyed by ramps.rowid and is kept in
+    step by triggers, so upsert_ramp/deletes need no extra work. It is
+    rebuilt on every start because VACUUM may renumber rowids of a table
+    with a TEXT primary key. Falls back to a plain (lat, lng) index if this
+    SQLite build lacks the rtree module.
+    """
+    try:
+        conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS ramps_rtree USING rtree(id, min_lat, max_lat, min_lng, max_lng)"
+        )
+    except sqlite3.OperationalError:
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_ramps_lat_lng ON ramps(lat, lng)")
+        return
+
+    conn.executescript(
+        """
+        CREATE TRIGGER IF NOT EXISTS ramps_rtree_ai AFTER INSERT ON ramps
+        WHEN NEW.lat IS NOT NULL AND NEW.lng IS NOT NULL
+        BEGIN
+          INSERT OR REPLACE INTO ramps_rtree VALUES (NEW.rowid, NEW.lat, NEW.lat, NEW.lng, NEW.lng);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS ramps_rtree_au AFTER UPDATE OF lat, lng ON ramps
+        BEGIN
+          DELETE FROM ramps_rtree WHERE id = OLD.rowid;
+          INSERT INTO ramps_rtree
+            SELECT NEW.rowid, NEW.lat, NEW.lat, NEW.lng, NEW.lng
+            WHERE NEW.lat IS NOT NULL AND NEW.lng IS NOT NULL;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS ramps_rtree_ad AFTER DELETE ON ramps
+        BEGIN
+          DELETE FROM ramps_rtree WHERE id = OLD.rowid;
+        END;
+
+        DELETE FROM ramps_rtree;
+        INSERT INTO ramps_rtree
+          SELECT rowid, lat, lat, lng, lng FROM ramps WHERE lat IS NOT NULL AND lng IS NOT NULL;
+        """
+    )
+
+
+def _has_rtree(conn: sqlite3.Connection) -> bool:
+    return one(conn, "SELECT 1 AS ok FROM sqlite_master WHERE name = 'ramps_rtree'") is not None
+
+
+def _init_search_index(conn: sqlite3.Connection) -> None:
+    """
+    Full-text search over transcript passages and hit snippets (FTS5, porter
+    stemming). Both FTS tables are external-content indexes over a regular
+    table and kept in step by triggers; transcript_segments itself is written
+    by replace_transcript_segments() on ingest. Skipped (search disabled) if
+    this SQLite build lacks FTS5.
+    """
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS transcript_segments (
+          seg_id INTEGER PRIMARY KEY,
+          video_id TEXT NOT NULL,
+          t_start REAL,
+          t_end REAL,
+          text TEXT NOT NULL,
+          FOREIGN KEY(video_id) REFERENCES videos(video_id) ON DELETE CASCADE
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_transcript_segments_video ON transcript_segments(video_id)")
+
+    fresh = not _has_fts(conn)
+    try:
+        conn.execute(
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS transcript_fts USING fts5(
+              text, content='transcript_segments', content_rowid='seg_id', tokenize='porter unicode61'
+            )
             """
         )
+        conn.execute(
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS snippet_fts USING fts5(
+              snippet, content='bait_hits', content_rowid='hit_id', tokenize='porter unicode61'
+            )
+            """
+        )
+    except sqlite3.OperationalError:
+        log.warning("SQLite has no FTS5; /api/search is disabled")
+        return
+
+    conn.executescript(
+        """
+        CREATE TRIGGER IF NOT EXISTS transcript_fts_ai AFTER INSERT ON transcript_segments
+        BEGIN
+          INSERT INTO transcript_fts(rowid, text) VALUES (NEW.seg_id, NEW.text);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS transcript_fts_ad AFTER DELETE ON transcript_segments
+        BEGIN
+          INSERT INTO transcript_fts(transcript_fts, rowid, text) VALUES ('delete', OLD.seg_id, OLD.text);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS snippet_fts_ai AFTER INSERT ON bait_hits
+        WHEN NEW.snippet IS NOT NULL
+        BEGIN
+          INSERT INTO snippet_fts(rowid, snippet) VALUES (NEW.hit_id, NEW.snippet);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS snippet_fts_ad AFTER DELETE ON bait_hits
+        WHEN OLD.snippet IS NOT NULL
+        BEGIN
+          INSERT INTO snippet_fts(snippet_fts, rowid, snippet) VALUES ('delete', OLD.hit_id, OLD.snippet);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS snippet_fts_au AFTER UPDATE OF snippet ON bait_hits
+        BEGIN
+          INSERT INTO snippet_fts(snippet_fts, rowid, snippet)
+            SELECT 'delete', OLD.hit_id, OLD.snippet WHERE OLD.snippet IS NOT NULL;
+          INSERT INTO snippet_fts(rowid, snippet)
+            SELECT NEW.hit_id, NEW.snippet WHERE NEW.snippet IS NOT NULL;
+        END;
+        """
+    )
+    if fresh:
+        conn.execute("INSERT INTO transcript_fts(transcript_fts) VALUES ('rebuild')")
+        conn.execute("INSERT INTO snippet_fts(snippet_fts) VALUES ('rebuild')")
+
+
+def _has_fts(conn: sqlite3.Connection) -> bool:
+    return one(conn, "SELECT 1 AS ok FROM sqlite_master WHERE name = 'snippet_fts'") is not None
+
+
+def bump_version(conn: sqlite3.Connection, name: str) -> None:
+    conn.execute(
+        """
+        INSERT INTO data_versions(name, version) VALUES(?, 1)
+        ON CONFLICT(name) DO UPDATE SET version = version + 1
+        """,
+        (name,),
+    )
+
+
+def get_versions(conn: sqlite3.Connection, *names: str) -> Dict[str, int]:
+    marks = ", ".join("?" * len(names))
+    found = {r[0]: int(r[1]) for r in conn.execute(f"SELECT name, version FROM data_versions WHERE name IN ({marks})", names)}
+    return {n: found.get(n, 0) for n in names}
 
 
 def one(conn: sqlite3.Connection, sql: str, params: Tuple[Any, ...] = ()) -> Optional[Dict[str, Any]]:
@@ -102,6 +714,42 @@ def many(conn: sqlite3.Connection, sql: str, params: Tuple[Any, ...] = ()) -> Li
     return [dict(r) for r in cur.fetchall()]
 
 
+def rows(conn: sqlite3.Connection, sql: str, params: Tuple[Any, ...] = ()) -> List[sqlite3.Row]:
+    """
+    Like many() but leaves the rows as sqlite3.Row, for results that go
+    straight to the response serializer: it builds each row's dict as it
+    encodes it, instead of a full list of dicts living next to the body.
+    """
+    return conn.execute(sql, params).fetchall()
+
+
+def stream_rows(
+    conn: sqlite3.Connection, sql: str, params: Tuple[Any, ...] = (), batch_size: int = STREAM_BATCH_ROWS
+) -> Tuple[List[str], Iterator[Tuple[Any, ...]]]:
+    """
+    Lazy many(): (column names, iterator of plain tuples). Rows come off the
+    cursor batch_size at a time, so memory stays flat however many match.
+    The query runs (and errors surface) here; the connection must stay
+    checked out until the iterator is exhausted or closed.
+    """
+    cur = conn.cursor()
+    cur.row_factory = None  # tuples; the names are shared via `columns`
+    cur.execute(sql, params)
+    columns = [d[0] for d in cur.description]
+
+    def it() -> Iterator[Tuple[Any, ...]]:
+        try:
+            while True:
+                batch = cur.fetchmany(batch_size)
+                if not batch:
+                    return
+                yield from batch
+        finally:
+            cur.close()
+
+    return columns, it()
+
+
 def upsert_video(conn: sqlite3.Connection, v: Dict[str, Any]) -> None:
     conn.execute(
         """
@@ -126,6 +774,107 @@ def upsert_video(conn: sqlite3.Connection, v: Dict[str, Any]) -> None:
             v.get("created_at", now_iso()),
         ),
     )
+    bump_version(conn, "videos")
+
+
+def ensure_video(conn: sqlite3.Connection, video_id: str, source: Optional[str] = None) -> None:
+    """Creates a bare videos row if missing; never overwrites existing metadata."""
+    cur = conn.execute(
+        "INSERT INTO videos(video_id, source, created_at) VALUES(?, ?, ?) ON CONFLICT(video_id) DO NOTHING",
+        (video_id, source, now_iso()),
+    )
+    if cur.rowcount:
+        bump_version(conn, "videos")
+
+
+def get_transcript_hashes(conn: sqlite3.Connection) -> Dict[str, str]:
+    """content_sha256 -> video_id for every ingested transcript."""
+    return {r[0]: r[1] for r in conn.execute("SELECT content_sha256, video_id FROM transcripts")}
+
+
+def upsert_transcript(conn: sqlite3.Connection, t: Dict[str, Any]) -> Optional[str]:
+    """
+    Records an ingested transcript. Returns the previous content hash for the
+    video (None if new), so callers can tell a changed transcript from a new one.
+    """
+    prev = one(conn, "SELECT content_sha256 FROM transcripts WHERE video_id = ?", (t.get("video_id"),))
+    conn.execute(
+        """
+        INSERT INTO transcripts(video_id, content_sha256, source, text, cues, created_at)
+        VALUES(?, ?, ?, ?, ?, ?)
+        ON CONFLICT(video_id) DO UPDATE SET
+          content_sha256=excluded.content_sha256,
+          source=excluded.source,
+          text=COALESCE(excluded.text, transcripts.text),
+          cues=COALESCE(excluded.cues, transcripts.cues)
+        """,
+        (
+            t.get("video_id"),
+            t.get("content_sha256"),
+            t.get("source"),
+            t.get("text"),
+            t.get("cues"),
+            t.get("created_at", now_iso()),
+        ),
+    )
+    return prev["content_sha256"] if prev else None
+
+
+def replace_transcript_segments(
+    conn: sqlite3.Connection, video_id: str, segments: Iterable[Tuple[Optional[float], Optional[float], str]]
+) -> int:
+    """Replaces the searchable passages of a video's transcript; transcript_fts follows via triggers."""
+    conn.execute("DELETE FROM transcript_segments WHERE video_id = ?", (video_id,))
+    rows = [(video_id, t0, t1, text) for t0, t1, text in segments if text]
+    conn.executemany("INSERT INTO transcript_segments(video_id, t_start, t_end, text) VALUES(?, ?, ?, ?)", rows)
+    bump_version(conn, "transcripts")
+    return len(rows)
+
+
+def get_stored_transcript(conn: sqlite3.Connection, video_id: str) -> Optional[Dict[str, Any]]:
+    return one(conn, "SELECT video_id, text, cues FROM transcripts WHERE video_id = ?", (video_id,))
+
+
+def get_alias_versions(conn: sqlite3.Connection) -> Dict[str, str]:
+    return {r[0]: r[1] for r in conn.execute("SELECT slug, alias_hash FROM alias_versions")}
+
+
+def save_alias_versions(conn: sqlite3.Connection, versions: Dict[str, str]) -> None:
+    """Replaces the recorded alias hashes with `versions` (slug -> hash)."""
+    now = now_iso()
+    conn.execute(
+        "DELETE FROM alias_versions WHERE slug NOT IN (SELECT value FROM json_each(?))",
+        (json.dumps(list(versions)),),
+    )
+    conn.executemany(
+        """
+        INSERT INTO alias_versions(slug, alias_hash, updated_at) VALUES(?, ?, ?)
+        ON CONFLICT(slug) DO UPDATE SET alias_hash=excluded.alias_hash, updated_at=excluded.updated_at
+        """,
+        [(slug, h, now) for slug, h in versions.items()],
+    )
+
+
+def delete_bait_hits_for_video(conn: sqlite3.Connection, video_id: str) -> int:
+    cur = conn.execute("DELETE FROM bait_hits WHERE video_id = ?", (video_id,))
+    if cur.rowcount:
+        bump_version(conn, "bait_hits")
+    return cur.rowcount
+
+
+def delete_bait_hits_for_baits(conn: sqlite3.Connection, names: List[str], video_id: Optional[str] = None) -> int:
+    """Deletes hits for the given bait names, everywhere or for one video."""
+    if not names:
+        return 0
+    sql = "DELETE FROM bait_hits WHERE bait_id IN (SELECT bait_id FROM baits WHERE name IN (SELECT value FROM json_each(?)))"
+    params: Tuple[Any, ...] = (json.dumps(names),)
+    if video_id is not None:
+        sql += " AND video_id = ?"
+        params += (video_id,)
+    cur = conn.execute(sql, params)
+    if cur.rowcount:
+        bump_version(conn, "bait_hits")
+    return cur.rowcount
 
 
 def upsert_ramp(conn: sqlite3.Connection, r: Dict[str, Any]) -> None:
@@ -150,6 +899,124 @@ def upsert_ramp(conn: sqlite3.Connection, r: Dict[str, Any]) -> None:
             r.get("created_at", now_iso()),
         ),
     )
+    bump_version(conn, "ramps")
+
+
+def delete_ramps_except(conn: sqlite3.Connection, ramp_ids: List[str]) -> int:
+    cur = conn.execute(
+        "DELETE FROM ramps WHERE ramp_id NOT IN (SELECT value FROM json_each(?))",
+        (json.dumps(ramp_ids),),
+    )
+    if cur.rowcount:
+        bump_version(conn, "ramps")
+    return cur.rowcount
+
+
+def rebuild_ramps_geojson(conn: sqlite3.Connection) -> int:
+    """
+    Builds the /api/ramps FeatureCollection from ramps.raw_json (the original
+    GeoJSON features) and stores it gzip-compressed in geojson_blobs.
+    """
+    features = [r[0] for r in conn.execute("SELECT raw_json FROM ramps WHERE raw_json IS NOT NULL ORDER BY ramp_id")]
+    body = '{"type":"FeatureCollection","features":[' + ",".join(features) + "]}"
+    conn.execute(
+        """
+        INSERT INTO geojson_blobs(name, body_gz, feature_count, built_at)
+        VALUES('ramps', ?, ?, ?)
+        ON CONFLICT(name) DO UPDATE SET
+          body_gz=excluded.body_gz,
+          feature_count=excluded.feature_count,
+          built_at=excluded.built_at
+        """,
+        (gzip.compress(body.encode("utf-8"), compresslevel=6), len(features), now_iso()),
+    )
+    return len(features)
+
+
+def get_geojson_blob(conn: sqlite3.Connection, name: str) -> Optional[Dict[str, Any]]:
+    return one(conn, "SELECT name, body_gz, feature_count, built_at FROM geojson_blobs WHERE name = ?", (name,))
+
+
+def get_sync_state(conn: sqlite3.Connection, name: str) -> Optional[Dict[str, Any]]:
+    return one(conn, "SELECT * FROM sync_state WHERE name = ?", (name,))
+
+
+def save_sync_state(conn: sqlite3.Connection, name: str, **fields: Any) -> None:
+    """Upserts sync_state; only the given fields (etag, last_edit, synced_at, checked_at) change."""
+    cols = [c for c in ("etag", "last_edit", "synced_at", "checked_at") if c in fields]
+    conn.execute(
+        f"""
+        INSERT INTO sync_state(name{"".join(", " + c for c in cols)})
+        VALUES(?{", ?" * len(cols)})
+        ON CONFLICT(name) DO UPDATE SET {", ".join(f"{c}=excluded.{c}" for c in cols) or "name=name"}
+        """,
+        (name, *[fields[c] for c in cols]),
+    )
+
+
+RAMP_COLUMNS = "r.ramp_id, r.name, r.lat, r.lng, r.ramp_type, r.raw_json"
+
+
+def ramps_in_bbox(
+    conn: sqlite3.Connection, min_lng: float, min_lat: float, max_lng: float, max_lat: float, limit: int = 5000
+) -> List[Dict[str, Any]]:
+    if _has_rtree(conn):
+        sql = f"""
+            SELECT {RAMP_COLUMNS}
+            FROM ramps_rtree t
+            JOIN ramps r ON r.rowid = t.id
+            WHERE t.max_lat >= ? AND t.min_lat <= ? AND t.max_lng >= ? AND t.min_lng <= ?
+            LIMIT ?
+        """
+    else:
+        sql = f"""
+            SELECT {RAMP_COLUMNS}
+            FROM ramps r
+            WHERE r.lat >= ? AND r.lat <= ? AND r.lng >= ? AND r.lng <= ?
+            LIMIT ?
+        """
+    return many(conn, sql, (min_lat, max_lat, min_lng, max_lng, int(limit)))
+
+
+def _haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lng2 - lng1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * 6371.0088 * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _box_around(lat: float, lng: float, km: float) -> Tuple[float, float, float, float]:
+    # 111 km/degree slightly overestimates the box, which is the safe side
+    dlat = km / 111.0
+    dlng = km / (111.0 * max(0.01, math.cos(math.radians(lat))))
+    return lng - dlng, lat - dlat, lng + dlng, lat + dlat
+
+
+def nearest_ramps(conn: sqlite3.Connection, lat: float, lng: float, k: int = 5) -> List[Dict[str, Any]]:
+    """
+    k nearest ramps by great-circle distance. Grows a search box through the
+    spatial index until it holds k candidates, then re-queries a box as wide
+    as the k-th candidate's distance so nothing closer outside the first box
+    is missed.
+    """
+    km = 2.0
+    candidates: List[Dict[str, Any]] = []
+    while km <= 4000:
+        candidates = ramps_in_bbox(conn, *_box_around(lat, lng, km), limit=1_000_000)
+        if len(candidates) >= k:
+            break
+        km *= 4
+
+    if len(candidates) >= k:
+        for c in candidates:
+            c["distance_km"] = _haversine_km(lat, lng, c["lat"], c["lng"])
+        kth = sorted(c["distance_km"] for c in candidates)[k - 1]
+        candidates = ramps_in_bbox(conn, *_box_around(lat, lng, max(kth, 0.001)), limit=1_000_000)
+
+    for c in candidates:
+        c["distance_km"] = round(_haversine_km(lat, lng, c["lat"], c["lng"]), 3)
+    candidates.sort(key=lambda c: c["distance_km"])
+    return candidates[:k]
 
 
 def create_link(conn: sqlite3.Connection, link: Dict[str, Any]) -> None:
@@ -166,23 +1033,65 @@ def create_link(conn: sqlite3.Connection, link: Dict[str, Any]) -> None:
             link.get("created_at", now_iso()),
         ),
     )
+    bump_version(conn, "links")
+
+
+# In-process name -> bait_id memo. bait rows are never deleted by the app, so
+# committed entries stay valid; but entries are added mid-transaction, so every
+# write rollback must go through rollback() (or call clear_bait_cache()) in
+# case the transaction created baits that no longer exist.
+_BAIT_IDS: Dict[str, int] = {}
+_IN_CHUNK = 500  # stay well under SQLITE_MAX_VARIABLE_NUMBER
+
+
+def clear_bait_cache() -> None:
+    _BAIT_IDS.clear()
+
+
+def rollback(conn: sqlite3.Connection) -> None:
+    """conn.rollback() that also forgets bait ids memoized in the discarded transaction."""
+    conn.rollback()
+    clear_bait_cache()
+
+
+def resolve_bait_ids(conn: sqlite3.Connection, baits: Dict[str, Optional[str]]) -> Dict[str, int]:
+    """
+    Maps bait names -> bait_id for a whole batch, creating missing baits.
+    `baits` is {name: category}; category is set on new rows and fills in a missing one.
+    Costs one executemany + one IN (...) lookup per chunk for names not memoized.
+    """
+    ids: Dict[str, int] = {}
+    missing: List[str] = []
+    for name in baits:
+        bait_id = _BAIT_IDS.get(name)
+        if bait_id is None:
+            missing.append(name)
+        else:
+            ids[name] = bait_id
+
+    if missing:
+        now = now_iso()
+        conn.executemany(
+            """
+            INSERT INTO baits(name, category, created_at) VALUES(?, ?, ?)
+            ON CONFLICT(name) DO UPDATE SET category = excluded.category
+            WHERE baits.category IS NULL AND excluded.category IS NOT NULL
+            """,
+            [(name, baits[name], now) for name in missing],
+        )
+        for i in range(0, len(missing), _IN_CHUNK):
+            chunk = missing[i : i + _IN_CHUNK]
+            marks = ", ".join("?" * len(chunk))
+            for row in conn.execute(f"SELECT bait_id, name FROM baits WHERE name IN ({marks})", chunk):
+                ids[row["name"]] = _BAIT_IDS[row["name"]] = int(row["bait_id"])
+    return ids
 
 
 def ensure_bait(conn: sqlite3.Connection, name: str, category: Optional[str] = None) -> int:
     name = (name or "").strip()
     if not name:
         raise ValueError("bait name is empty")
-
-    row = one(conn, "SELECT bait_id FROM baits WHERE name = ?", (name,))
-    if row:
-        return int(row["bait_id"])
-
-    conn.execute(
-        "INSERT INTO baits(name, category, created_at) VALUES(?, ?, ?)",
-        (name, category, now_iso()),
-    )
-    row2 = one(conn, "SELECT bait_id FROM baits WHERE name = ?", (name,))
-    return int(row2["bait_id"])
+    return resolve_bait_ids(conn, {name: category})[name]
 
 
 def insert_bait_hits(conn: sqlite3.Connection, video_id: str, hits: List[Dict[str, Any]]) -> int:
@@ -195,72 +1104,492 @@ def insert_bait_hits(conn: sqlite3.Connection, video_id: str, hits: List[Dict[st
       t_end (optional) float seconds
       confidence (optional) int
       category (optional)
+
+    Idempotent: a hit with the same (video_id, bait, bait_text, t_start) as an
+    existing row updates it in place (only if snippet/t_end/confidence differ),
+    so replaying a payload doesn't double counts. Returns the number of new
+    rows; the bait_hits version is only bumped when something changed.
+    Bait names are resolved once per batch and rows go in with executemany.
     """
-    count = 0
+    if not hits:
+        return 0
+
+    names: Dict[str, Optional[str]] = {}
     for h in hits:
-        bait_name = h.get("bait_name") or h.get("name")
-        category = h.get("category")
-        bait_id = ensure_bait(conn, bait_name, category=category)
+        name = h.get("bait_name") or h.get("name") or ""
+        if not isinstance(name, str) or not name.strip():
+            raise ValueError("bait name must be a non-empty string")
+        name = name.strip()
+        if names.get(name) is None:
+            names[name] = h.get("category")
+    bait_ids = resolve_bait_ids(conn, names)
 
-        conn.execute(
-            """
-            INSERT INTO bait_hits(video_id, bait_id, bait_text, snippet, t_start, t_end, confidence, created_at)
-            VALUES(?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                video_id,
-                bait_id,
-                h.get("bait_text"),
-                h.get("snippet"),
-                h.get("t_start"),
-                h.get("t_end"),
-                int(h.get("confidence", 70)),
-                now_iso(),
-            ),
+    now = now_iso()
+    rows = [
+        (
+            video_id,
+            bait_ids[(h.get("bait_name") or h.get("name")).strip()],
+            h.get("bait_text"),
+            h.get("snippet"),
+            h.get("t_start"),
+            h.get("t_end"),
+            int(h.get("confidence", 70)),
+            now,
         )
-        count += 1
-    return count
+        for h in hits
+    ]
+    last_id = conn.execute("SELECT COALESCE(MAX(hit_id), 0) FROM bait_hits").fetchone()[0]
+    changes = conn.total_changes
+    conn.executemany(
+        f"""
+        INSERT INTO bait_hits(video_id, bait_id, bait_text, snippet, t_start, t_end, confidence, created_at)
+        VALUES(?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT({_HIT_KEY}) DO UPDATE SET
+          snippet=excluded.snippet,
+          t_end=excluded.t_end,
+          confidence=excluded.confidence
+        WHERE (bait_hits.snippet, bait_hits.t_end, bait_hits.confidence)
+          IS NOT (excluded.snippet, excluded.t_end, excluded.confidence)
+        """,
+        rows,
+    )
+    if conn.total_changes == changes:
+        return 0  # a pure replay: nothing for clients to refetch
+    inserted = conn.execute("SELECT COUNT(*) FROM bait_hits WHERE hit_id > ?", (last_id,)).fetchone()[0]
+    bump_version(conn, "bait_hits")
+    if inserted:
+        _HITS_WRITTEN.add(id(conn))
+    return inserted
+
+
+def replace_bait_hits(conn: sqlite3.Connection, video_id: str, hits: List[Dict[str, Any]]) -> int:
+    """
+    Makes `hits` the complete set of hits for the video: old rows are deleted
+    and the new ones written atomically (in a savepoint, so this also holds
+    inside a caller's larger transaction).
+    """
+    conn.execute("SAVEPOINT replace_hits")
+    try:
+        delete_bait_hits_for_video(conn, video_id)
+        n = insert_bait_hits(conn, video_id, hits)
+    except Exception:
+        conn.execute("ROLLBACK TO replace_hits")
+        clear_bait_cache()
+        raise
+    finally:
+        conn.execute("RELEASE replace_hits")
+    return n
+
+
+# Selectable fields for page_baits_for_video -> SQL expression
+HIT_FIELDS: Dict[str, str] = {
+    "hit_id": "bh.hit_id",
+    "video_id": "bh.video_id",
+    "bait_name": "b.name",
+    "category": "b.category",
+    "bait_text": "bh.bait_text",
+    "snippet": "bh.snippet",
+    "t_start": "bh.t_start",
+    "t_end": "bh.t_end",
+    "confidence": "bh.confidence",
+    "created_at": "bh.created_at",
+}
+
+
+def hit_fields(fields: Optional[List[str]] = None) -> List[str]:
+    """Validates a requested subset of HIT_FIELDS (None = all of them)."""
+    fields = fields or list(HIT_FIELDS)
+    unknown = [f for f in fields if f not in HIT_FIELDS]
+    if unknown:
+        raise ValueError(f"unknown fields {unknown}; available: {list(HIT_FIELDS)}")
+    return fields
+
+
+def _hits_query(
+    after_id: int, video_id: Optional[str], bait: Optional[str], fields: Optional[List[str]] = None
+) -> Tuple[str, List[Any]]:
+    where = "bh.hit_id > ?"
+    params: List[Any] = [int(after_id)]
+    if video_id is not None:
+        where += " AND bh.video_id = ?"
+        params.append(video_id)
+    if bait is not None:
+        where += " AND b.name = ?"
+        params.append(bait)
+    cols = ", ".join(f"{HIT_FIELDS[f]} AS {f}" for f in hit_fields(fields))
+    return f"SELECT {cols} FROM bait_hits bh JOIN baits b ON b.bait_id = bh.bait_id WHERE {where} ORDER BY bh.hit_id", params
+
+
+def hits_after(
+    conn: sqlite3.Connection,
+    after_id: int,
+    limit: int = 500,
+    video_id: Optional[str] = None,
+    bait: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Hits with hit_id > after_id in id (= commit) order, all HIT_FIELDS; optional video/bait filter."""
+    sql, params = _hits_query(after_id, video_id, bait)
+    return many(conn, sql + " LIMIT ?", (*params, int(limit)))
+
 
+def iter_hits(
+    conn: sqlite3.Connection,
+    after_id: int = 0,
+    video_id: Optional[str] = None,
+    bait: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+) -> Tuple[List[str], Iterator[Tuple[Any, ...]]]:
+    """Every matching hit in hit_id order as stream_rows() tuples, for exports of any size."""
+    sql, params = _hits_query(after_id, video_id, bait, fields)
+    return stream_rows(conn, sql, tuple(params))
 
-def get_baits_for_video(conn: sqlite3.Connection, video_id: str) -> List[Dict[str, Any]]:
-    return many(
+
+def max_hit_id(conn: sqlite3.Connection) -> int:
+    return int(conn.execute("SELECT COALESCE(MAX(hit_id), 0) FROM bait_hits").fetchone()[0])
+
+
+def page_baits_for_video(
+    conn: sqlite3.Connection,
+    video_id: str,
+    limit: int = 100,
+    after: Optional[Tuple[str, int]] = None,
+    fields: Optional[List[str]] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[Tuple[str, int]]]:
+    """
+    One page of a video's hits, newest first, by keyset on (created_at, hit_id)
+    so each page is an index range scan no matter how deep it is.
+    `after` is the key returned with the previous page. Returns (items, next
+    key or None). `fields` limits the returned keys (see HIT_FIELDS).
+    """
+    fields = hit_fields(fields)
+    cols = [f"{HIT_FIELDS[f]} AS {f}" for f in fields]
+    cols += ["bh.created_at AS _key_created_at", "bh.hit_id AS _key_hit_id"]
+    join = "JOIN baits b ON b.bait_id = bh.bait_id" if {"bait_name", "category"} & set(fields) else ""
+    where = "bh.video_id = ?"
+    params: List[Any] = [video_id]
+    if after is not None:
+        where += " AND (bh.created_at, bh.hit_id) < (?, ?)"
+        params += [after[0], int(after[1])]
+
+    rows = conn.execute(
+        f"""
+        SELECT {", ".join(cols)}
+        FROM bait_hits bh
+        {join}
+        WHERE {where}
+        ORDER BY bh.created_at DESC, bh.hit_id DESC
+        LIMIT ?
+        """,
+        tuple(params + [int(limit) + 1]),
+    ).fetchall()
+
+    more = len(rows) > limit
+    rows = rows[:limit]
+    items = [{f: r[f] for f in fields} for r in rows]
+    next_key = (rows[-1]["_key_created_at"], rows[-1]["_key_hit_id"]) if more else None
+    return items, next_key
+
+
+def bait_summary(conn: sqlite3.Connection, limit: int = 25) -> List[sqlite3.Row]:
+    # top-N straight off idx_bait_stats_hits; no scan of bait_hits
+    return rows(
         conn,
         """
         SELECT
-          bh.hit_id,
-          v.video_id,
           b.name AS bait_name,
           b.category,
-          bh.bait_text,
-          bh.snippet,
-          bh.t_start,
-          bh.t_end,
-          bh.confidence,
-          bh.created_at
-        FROM bait_hits bh
-        JOIN baits b ON b.bait_id = bh.bait_id
-        JOIN videos v ON v.video_id = bh.video_id
-        WHERE v.video_id = ?
-        ORDER BY bh.created_at DESC
+          s.hits,
+          s.videos,
+          s.last_seen
+        FROM bait_stats s
+        JOIN baits b ON b.bait_id = s.bait_id
+        WHERE s.hits > 0
+        ORDER BY s.hits DESC
+        LIMIT ?
         """,
-        (video_id,),
+        (int(limit),),
     )
 
 
-def bait_summary(conn: sqlite3.Connection, limit: int = 25) -> List[Dict[str, Any]]:
-    return many(
+TREND_BUCKETS = ("day", "week")
+
+
+def bait_trends(
+    conn: sqlite3.Connection,
+    start_day: str,
+    end_day: str,
+    bucket: str = "week",
+    category: Optional[str] = None,
+    channel: Optional[str] = None,
+    ramp_id: Optional[str] = None,
+    bait: Optional[str] = None,
+    limit: int = 10,
+) -> List[Dict[str, Any]]:
+    """
+    Per-bait hit counts bucketed by day or week (weeks start Monday) over
+    [start_day, end_day] (YYYY-MM-DD, inclusive; week buckets cover whole weeks). Returns the top `limit`
+    baits by hits in the window:
+    [{"bait_name", "category", "hits", "videos", "points": {bucket: {"hits", "videos"}}}]
+
+    Without a channel/ramp filter this reads bait_day_totals/bait_week_totals
+    as stored; with one it groups the per-video bait_daily rows. `videos`
+    counts (video, day) pairs, which is the distinct video count as long as
+    each video's hits fall on one day (always true once it has a publish date).
+    """
+    if bucket == "week":
+        # whole weeks: widen the window back to the Monday on/before start_day
+        first = date.fromisoformat(start_day)
+        start_day = (first - timedelta(days=first.weekday())).isoformat()
+
+    if channel or ramp_id:
+        # per-video rows; needs a GROUP BY
+        bucket_col = "d.day" if bucket == "day" else "date(d.day, 'weekday 0', '-6 days')"
+        where = ["d.day BETWEEN ? AND ?"]
+        source = "bait_daily d JOIN baits b ON b.bait_id = d.bait_id"
+        select = f"{bucket_col} AS bucket, d.bait_id, SUM(d.hits) AS hits, COUNT(*) AS videos"
+        group = "GROUP BY bucket, d.bait_id"
+    else:
+        # pre-bucketed totals, read as stored
+        col = "day" if bucket == "day" else "week"
+        where = [f"d.{col} BETWEEN ? AND ?"]
+        source = f"bait_{col}_totals d JOIN baits b ON b.bait_id = d.bait_id"
+        select = f"d.{col} AS bucket, d.bait_id, d.hits, d.videos"
+        group = ""
+    params: List[Any] = [start_day, end_day]
+
+    if category:
+        where.append("b.category = ?")
+        params.append(category)
+    if bait:
+        where.append("b.name = ?")
+        params.append(bait)
+    if channel:
+        where.append("d.video_id IN (SELECT video_id FROM videos WHERE channel = ?)")
+        params.append(channel)
+    if ramp_id:
+        where.append("d.video_id IN (SELECT video_id FROM links WHERE ramp_id = ?)")
+        params.append(ramp_id)
+
+    rows = conn.execute(
+        f"SELECT {select} FROM {source} WHERE {' AND '.join(where)} {group}",
+        tuple(params),
+    ).fetchall()
+
+    series: Dict[int, Dict[str, Any]] = {}
+    for row in rows:
+        s = series.setdefault(row["bait_id"], {"hits": 0, "videos": 0, "points": {}})
+        s["hits"] += row["hits"]
+        s["videos"] += row["videos"]
+        s["points"][row["bucket"]] = {"hits": row["hits"], "videos": row["videos"]}
+    if not series:
+        return []
+
+    names = {
+        r["bait_id"]: r
+        for r in conn.execute(
+            "SELECT bait_id, name, category FROM baits WHERE bait_id IN (SELECT value FROM json_each(?))",
+            (json.dumps(list(series)),),
+        )
+    }
+    top = sorted(series.items(), key=lambda kv: (-kv[1]["hits"], names[kv[0]]["name"]))[: int(limit)]
+    return [
+        {"bait_name": names[bait_id]["name"], "category": names[bait_id]["category"], **s}
+        for bait_id, s in top
+    ]
+
+
+def fts_query(q: str) -> str:
+    """
+    Turns free text into a safe FTS5 query: every word must match (AND), a
+    trailing * keeps prefix matching, and FTS5 operators/punctuation typed by
+    users are quoted instead of being a syntax error.
+    """
+    terms = []
+    for word in q.split():
+        prefix = word.endswith("*")
+        word = word.rstrip("*").replace('"', '""')
+        if word:
+            terms.append(f'"{word}"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+
+# FTS5 wraps matches in these (private-use, never typed); the text is then
+# HTML-escaped and they become <mark> tags, so source text can't inject markup
+_MARK_OPEN, _MARK_CLOSE = "\ue000", "\ue001"
+
+
+def _marked_html(text: Optional[str]) -> Optional[str]:
+    if text is None:
+        return None
+    return html.escape(text).replace(_MARK_OPEN, "<mark>").replace(_MARK_CLOSE, "</mark>")
+
+
+def search_text(conn: sqlite3.Connection, q: str, limit: int = 20) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Ranked (bm25) full-text search. Returns {"transcripts": [...], "snippets": [...]};
+    each `text` is HTML-escaped with matches wrapped in <mark></mark>.
+    Raises RuntimeError if FTS5 is unavailable.
+    """
+    if not _has_fts(conn):
+        raise RuntimeError("full-text search is not available (SQLite built without FTS5)")
+    match = fts_query(q)
+    if not match:
+        return {"transcripts": [], "snippets": []}
+
+    transcripts = many(
         conn,
         """
-        SELECT
-          b.name AS bait_name,
-          b.category,
-          COUNT(*) AS hits,
-          COUNT(DISTINCT bh.video_id) AS videos
-        FROM bait_hits bh
+        SELECT s.video_id, v.title, v.channel, s.t_start, s.t_end,
+               snippet(transcript_fts, 0, ?, ?, '…', 24) AS text,
+               bm25(transcript_fts) AS score
+        FROM transcript_fts
+        JOIN transcript_segments s ON s.seg_id = transcript_fts.rowid
+        LEFT JOIN videos v ON v.video_id = s.video_id
+        WHERE transcript_fts MATCH ?
+        ORDER BY score
+        LIMIT ?
+        """,
+        (_MARK_OPEN, _MARK_CLOSE, match, int(limit)),
+    )
+    snippets = many(
+        conn,
+        """
+        SELECT bh.hit_id, bh.video_id, v.title, v.channel, b.name AS bait_name, bh.t_start, bh.t_end,
+               highlight(snippet_fts, 0, ?, ?) AS text,
+               bm25(snippet_fts) AS score
+        FROM snippet_fts
+        JOIN bait_hits bh ON bh.hit_id = snippet_fts.rowid
         JOIN baits b ON b.bait_id = bh.bait_id
-        GROUP BY b.bait_id
-        ORDER BY hits DESC
+        LEFT JOIN videos v ON v.video_id = bh.video_id
+        WHERE snippet_fts MATCH ?
+        ORDER BY score
         LIMIT ?
         """,
-        (int(limit),),
+        (_MARK_OPEN, _MARK_CLOSE, match, int(limit)),
+    )
+    for r in transcripts + snippets:
+        r["text"] = _marked_html(r["text"])
+    return {"transcripts": transcripts, "snippets": snippets}
+
+
+JOB_STATUSES = ("queued", "running", "done", "failed")
+_JOB_COLUMNS = (
+    "job_id, kind, status, attempts, max_attempts, worker, lease_until, progress_done, progress_total, "
+    "result, error, created_at, started_at, finished_at"
+)
+
+
+def _job_row(row: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    if row is not None and row.get("result") is not None:
+        row["result"] = json.loads(row["result"])
+    return row
+
+
+def enqueue_job(conn: sqlite3.Connection, kind: str, payload: Dict[str, Any], max_attempts: int = 3) -> int:
+    cur = conn.execute(
+        "INSERT INTO jobs(kind, payload, max_attempts, created_at) VALUES(?, ?, ?, ?)",
+        (kind, json.dumps(payload, ensure_ascii=False, separators=(",", ":")), max_attempts, now_iso()),
     )
+    return int(cur.lastrowid)
+
+
+def claim_job(conn: sqlite3.Connection, worker: str, lease_seconds: float) -> Optional[Dict[str, Any]]:
+    """
+    Takes the oldest queued job for `worker` and leases it for lease_seconds.
+    Running jobs whose lease ran out are first put back in the queue (or
+    failed, once out of attempts). Returns the job with its decoded payload,
+    or None. Commits.
+    """
+    now = datetime.now(timezone.utc).timestamp()
+    with conn:
+        conn.execute(
+            """
+            UPDATE jobs
+            SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'queued' END,
+                error = 'lease expired (worker ' || COALESCE(worker, '?') || ' stopped responding)',
+                worker = NULL,
+                lease_until = NULL,
+                finished_at = CASE WHEN attempts >= max_attempts THEN ? END
+            WHERE status = 'running' AND lease_until < ?
+            """,
+            (now_iso(), now),
+        )
+        row = conn.execute(
+            """
+            UPDATE jobs
+            SET status = 'running', worker = ?, lease_until = ?, attempts = attempts + 1,
+                started_at = ?, progress_done = 0, progress_total = NULL
+            WHERE job_id = (SELECT job_id FROM jobs WHERE status = 'queued' ORDER BY job_id LIMIT 1)
+            RETURNING job_id, kind, payload, attempts
+            """,
+            (worker, now + lease_seconds, now_iso()),
+        ).fetchone()
+    if row is None:
+        return None
+    job = dict(row)
+    job["payload"] = json.loads(job["payload"])
+    return job
+
+
+def renew_job_lease(conn: sqlite3.Connection, job_id: int, worker: str, lease_seconds: float) -> bool:
+    """Extends a running job's lease; False if `worker` no longer holds it. Commits."""
+    with conn:
+        cur = conn.execute(
+            "UPDATE jobs SET lease_until = ? WHERE job_id = ? AND worker = ? AND status = 'running'",
+            (datetime.now(timezone.utc).timestamp() + lease_seconds, job_id, worker),
+        )
+    return cur.rowcount == 1
+
+
+def set_job_progress(conn: sqlite3.Connection, job_id: int, worker: str, done: int, total: Optional[int] = None) -> bool:
+    """Records progress in the caller's transaction; False if `worker` no longer holds the job."""
+    cur = conn.execute(
+        """
+        UPDATE jobs SET progress_done = ?, progress_total = COALESCE(?, progress_total)
+        WHERE job_id = ? AND worker = ? AND status = 'running'
+        """,
+        (done, total, job_id, worker),
+    )
+    return cur.rowcount == 1
+
+
+def finish_job(conn: sqlite3.Connection, job_id: int, worker: str, result: Dict[str, Any]) -> bool:
+    cur = conn.execute(
+        """
+        UPDATE jobs SET status = 'done', result = ?, error = NULL, worker = NULL, lease_until = NULL, finished_at = ?
+        WHERE job_id = ? AND worker = ? AND status = 'running'
+        """,
+        (json.dumps(result, ensure_ascii=False, separators=(",", ":")), now_iso(), job_id, worker),
+    )
+    return cur.rowcount == 1
+
+
+def fail_job(conn: sqlite3.Connection, job_id: int, worker: str, error: str, retry: bool = True) -> bool:
+    """Puts the job back in the queue while it has attempts left (and retry is set), else marks it failed."""
+    cur = conn.execute(
+        """
+        UPDATE jobs
+        SET status = CASE WHEN ? AND attempts < max_attempts THEN 'queued' ELSE 'failed' END,
+            finished_at = CASE WHEN ? AND attempts < max_attempts THEN NULL ELSE ? END,
+            error = ?, worker = NULL, lease_until = NULL
+        WHERE job_id = ? AND worker = ? AND status = 'running'
+        """,
+        (retry, retry, now_iso(), error, job_id, worker),
+    )
+    return cur.rowcount == 1
+
+
+def get_job(conn: sqlite3.Connection, job_id: int) -> Optional[Dict[str, Any]]:
+    return _job_row(one(conn, f"SELECT {_JOB_COLUMNS} FROM jobs WHERE job_id = ?", (job_id,)))
+
+
+def list_jobs(conn: sqlite3.Connection, status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+    """Most recent jobs first, optionally only those with `status`."""
+    where = "WHERE status = ?" if status else ""
+    params: Tuple[Any, ...] = (status, limit) if status else (limit,)
+    return [_job_row(r) for r in many(conn, f"SELECT {_JOB_COLUMNS} FROM jobs {where} ORDER BY job_id DESC LIMIT ?", params)]
+
+
+def job_counts(conn: sqlite3.Connection) -> Dict[str, int]:
+    found = {r[0]: int(r[1]) for r in conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status")}
+    return {s: found.get(s, 0) for s in JOB_STATUSES}
@@ -0,0 +1,230 @@
+# backend/events.py
+"""
+In-process pub/sub for newly ingested bait hits, served as Server-Sent Events.
+
+insert_bait_hits marks its connection; when the pool's write transaction
+commits, db calls HitBroker.notify(). The broker then reads the committed
+rows past its high-water hit_id *once* and fans them out to every subscriber,
+so N connected clients cost one query per write instead of N polls. Hits
+written by other processes (job workers, the batch script) are picked up by
+a cheap data_versions check every SSE_POLL_SECONDS while anyone listens.
+
+Each subscriber's buffer is bounded (SSE_QUEUE_SIZE undelivered hits; a
+write's rows are queued as one batch). A client that falls that far behind
+is dropped: it gets a final `dropped` event and the
+stream ends; EventSource then reconnects with Last-Event-ID and the endpoint
+backfills what it missed from the database.
+"""
+import asyncio
+import logging
+import os
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+from db import get_pool, get_versions, hits_after, max_hit_id
+from responses import dumps
+
+log = logging.getLogger(__name__)
+
+SSE_QUEUE_SIZE = int(os.getenv("RAYBURN_SSE_QUEUE_SIZE", "1000"))
+SSE_MAX_CLIENTS = int(os.getenv("RAYBURN_SSE_MAX_CLIENTS", "500"))
+SSE_PING_SECONDS = float(os.getenv("RAYBURN_SSE_PING_SECONDS", "15"))
+SSE_POLL_SECONDS = float(os.getenv("RAYBURN_SSE_POLL_SECONDS", "2"))
+SSE_BACKFILL_LIMIT = int(os.getenv("RAYBURN_SSE_BACKFILL_LIMIT", "1000"))
+SSE_RETRY_MS = 3000  # client reconnect delay sent in the stream
+
+_FETCH_PAGE = 500
+
+
+class TooManySubscribers(RuntimeError):
+    pass
+
+
+class Subscriber:
+    def __init__(self, video_id: Optional[str], bait: Optional[str]):
+        self.video_id = video_id
+        self.bait = bait
+        # batches of hits; None = dropped, end the stream
+        self.queue: "asyncio.Queue[Optional[List[Dict[str, Any]]]]" = asyncio.Queue()
+        self.pending = 0  # hits queued but not yet sent
+        self.dropped = False
+
+    def wants(self, hit: Dict[str, Any]) -> bool:
+        return (self.video_id is None or hit["video_id"] == self.video_id) and (
+            self.bait is None or hit["bait_name"] == self.bait
+        )
+
+
+class HitBroker:
+    def __init__(self) -> None:
+        self._subs: Set[Subscriber] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional["asyncio.Task[None]"] = None
+        self.last_id = 0  # highest hit_id already fanned out
+        self._version = -1  # data_versions['bait_hits'] at the last fetch
+        self.published = 0
+        self.dropped = 0
+
+    # -------------------------
+    # Lifecycle
+    # -------------------------
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self.last_id, self._version = await run_in_threadpool(self._position)
+        self._task = self._loop.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for sub in list(self._subs):
+            self._drop(sub)
+
+    def notify(self) -> None:
+        """Thread-safe: new hits were committed in this process."""
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._wake.set)
+
+    # -------------------------
+    # Subscribers
+    # -------------------------
+    def subscribe(self, video_id: Optional[str] = None, bait: Optional[str] = None) -> Subscriber:
+        if len(self._subs) >= SSE_MAX_CLIENTS:
+            raise TooManySubscribers(f"too many live streams (max {SSE_MAX_CLIENTS})")
+        sub = Subscriber(video_id, bait)
+        self._subs.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        self._subs.discard(sub)
+
+    def _drop(self, sub: Subscriber) -> None:
+        """Frees a slow subscriber's buffer and leaves only the end-of-stream marker."""
+        self._subs.discard(sub)
+        sub.dropped = True
+        while not sub.queue.empty():
+            sub.queue.get_nowait()
+        sub.pending = 0
+        sub.queue.put_nowait(None)
+        self.dropped += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {"subscribers": len(self._subs), "last_id": self.last_id, "published": self.published, "dropped": self.dropped}
+
+    # -------------------------
+    # Fan-out
+    # -------------------------
+    def _position(self) -> Tuple[int, int]:
+        with get_pool().reader() as conn:
+            return max_hit_id(conn), get_versions(conn, "bait_hits")["bait_hits"]
+
+    def _fetch(self, after_id: int) -> Tuple[List[Dict[str, Any]], int]:
+        with get_pool().reader() as conn:
+            conn.execute("BEGIN")  # one snapshot for the version and the rows
+            version = get_versions(conn, "bait_hits")["bait_hits"]
+            if version == self._version:
+                return [], version
+            return hits_after(conn, after_id, _FETCH_PAGE), version
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), SSE_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                if not self._subs:
+                    # nobody listening: just keep the high-water mark current
+                    self.last_id, self._version = await run_in_threadpool(self._position)
+                    continue
+                while True:
+                    rows, version = await run_in_threadpool(self._fetch, self.last_id)
+                    if rows:
+                        self.last_id = rows[-1]["hit_id"]
+                        self._publish(rows)
+                    if len(rows) < _FETCH_PAGE:
+                        self._version = version
+                        break
+                    self._version = -1  # more pages pending: don't short-circuit on the version
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.warning("Hit broker fetch failed: %s", e)
+
+    def _publish(self, rows: List[Dict[str, Any]]) -> None:
+        self.published += len(rows)
+        for sub in list(self._subs):
+            batch = [hit for hit in rows if sub.wants(hit)]
+            if not batch:
+                continue
+            if sub.pending + len(batch) > SSE_QUEUE_SIZE:
+                self._drop(sub)
+                continue
+            sub.pending += len(batch)
+            sub.queue.put_nowait(batch)
+
+
+_BROKER: Optional[HitBroker] = None
+
+
+def get_broker() -> HitBroker:
+    global _BROKER
+    if _BROKER is None:
+        _BROKER = HitBroker()
+    return _BROKER
+
+
+# -------------------------
+# SSE framing
+# -------------------------
+def sse_event(event: str, data: Any, event_id: Optional[int] = None) -> bytes:
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: ".encode("utf-8") + dumps(data) + b"\n\n"
+
+
+async def stream_hits(
+    broker: HitBroker, sub: Subscriber, backfill: List[Dict[str, Any]], truncated: bool = False
+) -> AsyncIterator[bytes]:
+    """
+    SSE body for one subscriber: the backfilled hits, then live ones (skipping
+    any already sent), a comment ping every SSE_PING_SECONDS so proxies keep
+    the connection open, and a final `dropped` event if the client fell behind.
+    A `reset` event after a truncated backfill tells the client some hits were
+    skipped and it should refetch over REST.
+    """
+    sent = 0
+    try:
+        yield f"retry: {SSE_RETRY_MS}\n\n".encode("utf-8")
+        for hit in backfill:
+            sent = hit["hit_id"]
+            yield sse_event("hit", hit, sent)
+        if truncated:
+            yield sse_event("reset", {"reason": "backfill limit reached", "last_id": sent})
+        while True:
+            try:
+                batch = await asyncio.wait_for(sub.queue.get(), SSE_PING_SECONDS)
+            except asyncio.TimeoutError:
+                yield b": ping\n\n"
+                continue
+            if batch is None:
+                yield sse_event("dropped", {"reason": "client too slow", "last_id": sent})
+                return
+            for hit in batch:
+                sub.pending -= 1
+                if hit["hit_id"] <= sent:
+                    continue
+                sent = hit["hit_id"]
+                yield sse_event("hit", hit, sent)
+    finally:
+        broker.unsubscribe(sub)
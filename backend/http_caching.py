@@ -0,0 +1,105 @@
+# backend/http_caching.py
+"""
+Conditional GETs for the read endpoints: ETag / If-None-Match -> 304, plus
+Cache-Control and Vary so browsers and reverse proxies can keep copies.
+
+The ETag is never a hash of the body. It is built from the data_versions
+counters the endpoint's data comes from (bumped by every write in db.py),
+read in the same snapshot the handler then queries. A matching
+If-None-Match therefore answers 304 before any query or serialization runs:
+
+    @app.get("/api/baits/summary")
+    def api_bait_summary(..., _v: Validator = Depends(versioned("bait_hits"))):
+
+For handlers that return a Response themselves, call validator.apply(resp)
+(FastAPI only merges headers into responses it builds).
+"""
+import os
+import sqlite3
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable
+
+from fastapi import Depends, Request, Response
+
+from db import get_versions, read_conn
+
+# Bump when response shapes change, so clients' old validators stop matching
+ETAG_SCHEMA = "2"
+DEFAULT_MAX_AGE = int(os.getenv("RAYBURN_HTTP_MAX_AGE", "5"))
+STALE_WHILE_REVALIDATE = int(os.getenv("RAYBURN_HTTP_STALE_WHILE_REVALIDATE", "30"))
+
+
+class NotModified(Exception):
+    """Raised by a validator when the client's copy is current; see not_modified_handler."""
+
+    def __init__(self, headers: Dict[str, str]):
+        self.headers = headers
+
+
+def not_modified_handler(_request: Request, exc: NotModified) -> Response:
+    return Response(status_code=304, headers=exc.headers)
+
+
+def make_etag(*parts: Any) -> str:
+    # weak: the same representation may be sent gzip'd or not
+    return 'W/"' + "-".join([ETAG_SCHEMA, *(str(p) for p in parts)]) + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    bare = etag[2:] if etag.startswith("W/") else etag
+    return any((t.strip()[2:] if t.strip().startswith("W/") else t.strip()) == bare for t in header.split(","))
+
+
+def cache_control(max_age: int, private: bool = False) -> str:
+    scope = "private" if private else "public"
+    if max_age <= 0:
+        return f"{scope}, no-cache"
+    return f"{scope}, max-age={max_age}, stale-while-revalidate={STALE_WHILE_REVALIDATE}"
+
+
+class Validator:
+    def __init__(self, etag: str, max_age: int = DEFAULT_MAX_AGE, vary: str = "Accept-Encoding"):
+        self.etag = etag
+        self.headers = {"ETag": etag, "Cache-Control": cache_control(max_age), "Vary": vary}
+
+    def check(self, request: Request) -> None:
+        if etag_matches(request, self.etag):
+            raise NotModified(self.headers)
+
+    def apply(self, response: Response) -> Response:
+        for k, v in self.headers.items():
+            if k == "Vary" and "vary" in response.headers:
+                v = ", ".join(dict.fromkeys([*response.headers["vary"].split(", "), v]))
+            response.headers[k] = v
+        return response
+
+
+def version_token(conn: sqlite3.Connection, datasets: Iterable[str]) -> str:
+    return ".".join(str(v) for v in get_versions(conn, *datasets).values())
+
+
+def versioned(*datasets: str, max_age: int = DEFAULT_MAX_AGE, daily: bool = False) -> Callable[..., Validator]:
+    """
+    FastAPI dependency factory: validator over the given data_versions rows.
+    Opens a read transaction on the request's read_conn first, so the token
+    and the handler's queries see the same snapshot. daily=True also changes
+    the ETag at UTC midnight (for responses relative to "today").
+    """
+
+    def dependency(request: Request, response: Response, conn: sqlite3.Connection = Depends(read_conn)) -> Validator:
+        if not conn.in_transaction:
+            conn.execute("BEGIN")
+        parts = [version_token(conn, datasets)]
+        if daily:
+            parts.append(datetime.now(timezone.utc).strftime("%Y%m%d"))
+        v = Validator(make_etag(*parts), max_age)
+        v.check(request)
+        response.headers.update(v.headers)
+        return v
+
+    return dependency
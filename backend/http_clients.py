@@ -0,0 +1,106 @@
+# backend/http_clients.py
+import asyncio
+import os
+import random
+from dataclasses import dataclass
+from typing import Any, Dict, Tuple
+
+import httpx
+
+# Shared keep-alive pool settings (per upstream client)
+HTTP_MAX_CONNECTIONS = int(os.getenv("RAYBURN_HTTP_MAX_CONNECTIONS", "20"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("RAYBURN_HTTP_MAX_KEEPALIVE", "10"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("RAYBURN_HTTP_KEEPALIVE_EXPIRY", "60"))
+
+
+@dataclass(frozen=True)
+class UpstreamPolicy:
+    timeout: float
+    connect_timeout: float = 5.0
+    retries: int = 2
+    backoff: float = 0.25  # seconds; doubles per attempt, with jitter
+    retry_statuses: Tuple[int, ...] = (429, 500, 502, 503, 504)
+
+
+POLICIES: Dict[str, UpstreamPolicy] = {
+    "youtube": UpstreamPolicy(timeout=float(os.getenv("RAYBURN_YOUTUBE_TIMEOUT", "15"))),
+    "arcgis": UpstreamPolicy(timeout=float(os.getenv("RAYBURN_ARCGIS_TIMEOUT", "30"))),
+}
+
+_CLIENTS: Dict[str, httpx.AsyncClient] = {}
+
+
+def _http2_available() -> bool:
+    # httpx only speaks HTTP/2 when the optional `h2` package is installed
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _make_client(policy: UpstreamPolicy) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(policy.timeout, connect=policy.connect_timeout),
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+        http2=_http2_available(),
+    )
+
+
+async def startup() -> None:
+    for name, policy in POLICIES.items():
+        if name not in _CLIENTS:
+            _CLIENTS[name] = _make_client(policy)
+
+
+async def shutdown() -> None:
+    clients = list(_CLIENTS.values())
+    _CLIENTS.clear()
+    for client in clients:
+        await client.aclose()
+
+
+def _retry_delay(policy: UpstreamPolicy, attempt: int, response: Any = None) -> float:
+    if response is not None:
+        retry_after = response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return min(float(retry_after), 30.0)
+    return policy.backoff * (2 ** attempt) * random.uniform(0.5, 1.5)
+
+
+async def _send(client: httpx.AsyncClient, policy: UpstreamPolicy, method: str, url: str, **kwargs: Any) -> httpx.Response:
+    # Only idempotent requests are retried
+    retries = policy.retries if method.upper() in ("GET", "HEAD") else 0
+    for attempt in range(retries + 1):
+        try:
+            r = await client.request(method, url, **kwargs)
+        except httpx.TransportError:
+            if attempt >= retries:
+                raise
+            await asyncio.sleep(_retry_delay(policy, attempt))
+            continue
+
+        if r.status_code not in policy.retry_statuses or attempt >= retries:
+            return r
+        await r.aclose()
+        await asyncio.sleep(_retry_delay(policy, attempt, r))
+    raise AssertionError("unreachable")
+
+
+async def request(upstream: str, method: str, url: str, **kwargs: Any) -> httpx.Response:
+    """
+    Sends a request through the long-lived client for `upstream` ("youtube",
+    "arcgis"), applying that upstream's timeout and retry policy.
+
+    Outside the API process (scripts, before startup) a one-off client is used.
+    """
+    policy = POLICIES[upstream]
+    client = _CLIENTS.get(upstream)
+    if client is None:
+        async with _make_client(policy) as tmp:
+            return await _send(tmp, policy, method, url, **kwargs)
+    return await _send(client, policy, method, url, **kwargs)
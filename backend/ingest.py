@@ -0,0 +1,116 @@
+# backend/ingest.py
+"""
+Validation and writing of {"video": {...}, "hits": [...]} ingest records.
+
+Shared by the HTTP ingest endpoints (app.py) and background ingest jobs
+(jobs.py), so both accept exactly the same payloads.
+"""
+import math
+import sqlite3
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from db import clear_bait_cache, insert_bait_hits, now_iso, replace_bait_hits, upsert_video
+
+
+def parse_ingest_payload(payload: Any) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    Validates one {video, hits} record and returns (normalized video row,
+    normalized hits). Raises ValueError with a client-facing message, so a
+    bad record never reaches the database layer.
+    """
+    if not isinstance(payload, dict):
+        raise ValueError("payload must be a JSON object")
+
+    video = payload.get("video") or {}
+    hits = payload.get("hits") or []
+    if not isinstance(video, dict):
+        raise ValueError("payload.video must be an object")
+
+    video_id = video.get("video_id") or video.get("videoId") or ""
+    if not isinstance(video_id, str):
+        raise ValueError("payload.video.video_id must be a string")
+    video_id = video_id.strip()
+    if not video_id:
+        raise ValueError("payload.video.video_id is required")
+
+    if not isinstance(hits, list):
+        raise ValueError("payload.hits must be a list")
+    hits = [_parse_hit(i, hit) for i, hit in enumerate(hits)]
+
+    # Normalize video fields
+    vrow = {
+        "video_id": video_id,
+        "title": video.get("title"),
+        "channel": video.get("channel") or video.get("channelTitle"),
+        "published": video.get("published") or video.get("publishedAt"),
+        "url": video.get("url"),
+        "thumbnail": video.get("thumbnail"),
+        "source": video.get("source") or "ingest",
+        "created_at": now_iso(),
+    }
+    return vrow, hits
+
+
+def _parse_hit(i: int, hit: Any) -> Dict[str, Any]:
+    where = f"payload.hits[{i}]"
+    if not isinstance(hit, dict):
+        raise ValueError(f"{where} must be an object")
+
+    name = hit.get("bait_name") or hit.get("name") or ""
+    if not isinstance(name, str) or not name.strip():
+        raise ValueError(f"{where}.bait_name must be a non-empty string")
+
+    out: Dict[str, Any] = {"bait_name": name.strip()}
+    for key in ("bait_text", "snippet", "category"):
+        value = hit.get(key)
+        if value is not None and not isinstance(value, str):
+            raise ValueError(f"{where}.{key} must be a string")
+        out[key] = value
+    for key in ("t_start", "t_end"):
+        out[key] = _opt_number(hit.get(key), f"{where}.{key}")
+    confidence = _opt_number(hit.get("confidence"), f"{where}.confidence")
+    if confidence is not None:
+        out["confidence"] = int(confidence)
+    return out
+
+
+def _opt_number(value: Any, where: str) -> Optional[float]:
+    if value is None:
+        return None
+    # bool is an int subclass, but true/false is never a time or a score
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ValueError(f"{where} must be a number")
+    return value
+
+
+def ingest_records(
+    conn: sqlite3.Connection, records: Iterable[Tuple[int, Any]], replace: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    Writes (line_number, record) pairs in the caller's transaction. Each record
+    runs in its own SAVEPOINT so a bad record is reported without losing the
+    rest; a record may also be a ValueError (e.g. a line that wasn't JSON).
+    """
+    write_hits = replace_bait_hits if replace else insert_bait_hits
+    results: List[Dict[str, Any]] = []
+    if not conn.in_transaction:
+        conn.execute("BEGIN")
+    for lineno, record in records:
+        try:
+            if isinstance(record, ValueError):
+                raise record
+            vrow, hits = parse_ingest_payload(record)
+            conn.execute("SAVEPOINT ingest_record")
+            try:
+                upsert_video(conn, vrow)
+                n = write_hits(conn, vrow["video_id"], hits)
+            except Exception:
+                conn.execute("ROLLBACK TO ingest_record")
+                clear_bait_cache()  # may have memoized baits created in the rolled-back savepoint
+                raise
+            finally:
+                conn.execute("RELEASE ingest_record")
+            results.append({"line": lineno, "ok": True, "video_id": vrow["video_id"], "inserted": n})
+        except (ValueError, TypeError, sqlite3.Error) as e:
+            results.append({"line": lineno, "ok": False, "error": str(e)})
+    return results
@@ -0,0 +1,406 @@
+# backend/jobs.py
+"""
+Background jobs: transcribe / extract / ingest work queued in the `jobs` table.
+
+POST /api/jobs only inserts a row; worker *processes* drain the queue, so a
+heavy backfill never holds an API threadpool slot or the API's GIL. A worker
+claims the oldest queued job with a lease (JOB_LEASE_SECONDS) and a
+heartbeat thread keeps renewing it while the job runs. If the worker dies,
+the lease runs out and the next claim puts the job back in the queue, up to
+its max_attempts.
+
+Workers write through their own connection in short transactions (one per
+transcript, or per JOB_INGEST_BATCH ingest records), each also recording the
+job's progress, so API writes only ever wait on one small commit.
+
+Job payloads can only name files under RAYBURN_JOB_INPUT_DIR (default
+data/inbox; relative paths are taken from there). Paths, globs and manifest
+entries are resolved and checked when the job is queued, and again by the
+worker before it reads anything.
+
+Workers are started with the API (RAYBURN_JOB_WORKERS, 0 = none), or run
+standalone next to it:
+
+    python jobs.py --workers 4
+"""
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from db import (
+    claim_job,
+    connect,
+    fail_job,
+    finish_job,
+    get_transcript_hashes,
+    init_db,
+    renew_job_lease,
+    rollback,
+    set_job_progress,
+)
+from ingest import ingest_records, parse_ingest_payload
+
+log = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.getenv("RAYBURN_JOB_WORKERS", "1"))
+JOB_LEASE_SECONDS = float(os.getenv("RAYBURN_JOB_LEASE_SECONDS", "120"))
+JOB_POLL_SECONDS = float(os.getenv("RAYBURN_JOB_POLL_SECONDS", "1.0"))
+JOB_INGEST_BATCH = int(os.getenv("RAYBURN_JOB_INGEST_BATCH", "200"))
+JOB_MAX_ERRORS = 100  # per-item errors kept in a job's result
+JOB_INPUT_DIR = os.getenv("RAYBURN_JOB_INPUT_DIR", os.path.join("data", "inbox"))
+
+_PROCS: List[multiprocessing.Process] = []
+_STOP: Optional[Any] = None  # multiprocessing.Event shared with the worker processes
+
+
+class LeaseLost(RuntimeError):
+    """The job was reclaimed by another worker (our lease ran out)."""
+
+
+class JobInputError(ValueError):
+    """A payload the job can't run: a 400 at enqueue time, never retried by a worker."""
+
+
+class JobContext:
+    def __init__(self, conn: sqlite3.Connection, job_id: int, worker: str):
+        self.conn = conn
+        self.job_id = job_id
+        self.worker = worker
+
+    def commit(self, done: int, total: Optional[int] = None) -> None:
+        """Commits the work so far together with the job's progress."""
+        if not set_job_progress(self.conn, self.job_id, self.worker, done, total):
+            rollback(self.conn)
+            raise LeaseLost(f"job {self.job_id} is no longer held by {self.worker}")
+        self.conn.commit()
+
+
+# -------------------------
+# Payload validation (at enqueue time, so bad requests fail fast with a 400,
+# and again in the worker before it touches any file)
+# -------------------------
+def _input_root() -> Path:
+    return Path(JOB_INPUT_DIR).expanduser().resolve()
+
+
+def _confine(path: Path, what: str) -> Path:
+    root = _input_root()
+    path = path.resolve()
+    if path != root and root not in path.parents:
+        raise JobInputError(f"{what} must be inside the job input directory")
+    return path
+
+
+def input_path(raw: Any, what: str) -> Path:
+    """
+    Resolves a payload path or glob (relative ones against JOB_INPUT_DIR) and
+    rejects anything that ends up outside it, `..` and symlinks included.
+    """
+    if not isinstance(raw, str) or not raw:
+        raise JobInputError(f"{what} must be a non-empty string")
+    return _confine(_input_root() / Path(raw).expanduser(), what)
+
+
+def _check_ingest(payload: Dict[str, Any]) -> None:
+    if not isinstance(payload.get("records"), list):
+        raise JobInputError("ingest payload.records must be a list of {video, hits} records")
+    for i, record in enumerate(payload["records"]):
+        try:
+            parse_ingest_payload(record)
+        except ValueError as e:
+            raise JobInputError(f"ingest payload.records[{i}]: {e}")
+
+
+def _check_extract(payload: Dict[str, Any]) -> None:
+    keys = [k for k in ("path", "batch", "manifest") if payload.get(k) is not None]
+    if not keys:
+        raise JobInputError("extract payload needs one of: path, batch (directory or glob), manifest")
+    for k in keys:
+        input_path(payload[k], f"extract payload.{k}")
+
+
+def _check_transcribe(payload: Dict[str, Any]) -> None:
+    if payload.get("path") is None:
+        raise JobInputError("transcribe payload.path (an audio/video file) is required")
+    input_path(payload["path"], "transcribe payload.path")
+    import audio
+
+    backend = payload.get("backend", audio.DEFAULT_BACKEND)
+    if backend not in audio.BACKENDS:
+        raise JobInputError(f"unknown backend {backend!r}; available: {sorted(audio.BACKENDS)}")
+
+
+def validate_job(kind: str, payload: Any) -> None:
+    """Raises JobInputError (a ValueError) with a client-facing message."""
+    if kind not in JOB_KINDS:
+        raise JobInputError(f"unknown job kind {kind!r}; expected one of {sorted(JOB_KINDS)}")
+    if not isinstance(payload, dict):
+        raise JobInputError("payload must be a JSON object")
+    _CHECKS[kind](payload)
+
+
+# -------------------------
+# Job handlers: (ctx, payload) -> result dict
+# -------------------------
+def _run_ingest(ctx: JobContext, payload: Dict[str, Any]) -> Dict[str, Any]:
+    records = payload["records"]
+    replace = bool(payload.get("replace"))
+    ok = failed = inserted = 0
+    errors: List[Dict[str, Any]] = []
+    for i in range(0, len(records), JOB_INGEST_BATCH):
+        batch = [(i + j + 1, r) for j, r in enumerate(records[i : i + JOB_INGEST_BATCH])]
+        for r in ingest_records(ctx.conn, batch, replace):
+            if r["ok"]:
+                ok += 1
+                inserted += r["inserted"]
+            else:
+                failed += 1
+                if len(errors) < JOB_MAX_ERRORS:
+                    errors.append(r)
+        ctx.commit(i + len(batch), len(records))
+    return {"ok": ok, "failed": failed, "inserted": inserted, "errors": errors}
+
+
+def _run_extract(ctx: JobContext, payload: Dict[str, Any]) -> Dict[str, Any]:
+    from scripts.transcribe_extract import (
+        collect_batch_inputs,
+        extract_baits_cached,
+        file_sha256,
+        hits_to_db,
+        store_extraction,
+    )
+    from artifacts import get_store
+    from transcript import read_transcript
+
+    inputs: List[Tuple[Path, str]] = []
+    if payload.get("path"):
+        p = input_path(payload["path"], "extract payload.path")
+        inputs.append((p, payload.get("video_id") or p.stem))
+    batch, manifest = payload.get("batch"), payload.get("manifest")
+    inputs += collect_batch_inputs(
+        str(input_path(batch, "extract payload.batch")) if batch else None,
+        str(input_path(manifest, "extract payload.manifest")) if manifest else None,
+    )
+    # globs can reach through symlinks and manifests list paths of their own
+    inputs = [(_confine(p, f"extract input {p.name}"), vid) for p, vid in inputs]
+
+    store = None if payload.get("no_cache") else get_store()
+    done_hashes = {} if payload.get("force") else get_transcript_hashes(ctx.conn)
+    extracted = skipped = failed = inserted = 0
+    errors: List[Dict[str, Any]] = []
+    ctx.commit(0, len(inputs))
+
+    for i, (path, video_id) in enumerate(inputs, 1):
+        try:
+            sha = file_sha256(path)
+            if sha in done_hashes:
+                skipped += 1
+            else:
+                transcript = read_transcript(path)
+                hits, _cached = extract_baits_cached(lambda: transcript, sha, store)
+                inserted += store_extraction(ctx.conn, video_id, sha, f"text:{path.name}", hits_to_db(hits), transcript)
+                done_hashes[sha] = video_id
+                extracted += 1
+        except (OSError, ValueError, sqlite3.Error) as e:
+            rollback(ctx.conn)
+            failed += 1
+            if len(errors) < JOB_MAX_ERRORS:
+                errors.append({"path": str(path), "error": f"{type(e).__name__}: {e}"})
+        ctx.commit(i)
+    return {"extracted": extracted, "skipped": skipped, "failed": failed, "inserted": inserted, "errors": errors}
+
+
+def _run_transcribe(ctx: JobContext, payload: Dict[str, Any]) -> Dict[str, Any]:
+    import audio
+    from scripts.transcribe_extract import (
+        extract_baits_cached,
+        file_sha256,
+        hits_to_db,
+        store_extraction,
+        transcribe_media_cached,
+    )
+    from artifacts import get_store
+    from transcript import Transcript
+
+    media_path = input_path(payload["path"], "transcribe payload.path")
+    if not media_path.is_file():
+        raise JobInputError(f"Media file not found: {payload['path']}")
+    args = SimpleNamespace(
+        backend=payload.get("backend", audio.DEFAULT_BACKEND),
+        model=payload.get("model", audio.DEFAULT_MODEL),
+        chunk_seconds=float(payload.get("chunk_seconds", 30.0)),
+        workers=int(payload.get("workers", 2)),
+    )
+    store = None if payload.get("no_cache") else get_store()
+    ctx.commit(0, 2)
+
+    media_sha = file_sha256(media_path)
+    segments, extraction_sha = transcribe_media_cached(media_path, media_sha, args, store)
+    transcript = Transcript.from_segments(segments)
+    ctx.commit(1)
+
+    hits, _cached = extract_baits_cached(lambda: transcript, extraction_sha, store)
+    video_id = payload.get("video_id") or media_path.stem
+    inserted = store_extraction(ctx.conn, video_id, media_sha, f"media:{media_path.name}", hits_to_db(hits), transcript)
+    ctx.commit(2)
+    return {"video_id": video_id, "segments": len(segments), "hits": len(hits), "inserted": inserted}
+
+
+JOB_KINDS: Dict[str, Callable[[JobContext, Dict[str, Any]], Dict[str, Any]]] = {
+    "transcribe": _run_transcribe,
+    "extract": _run_extract,
+    "ingest": _run_ingest,
+}
+_CHECKS: Dict[str, Callable[[Dict[str, Any]], None]] = {
+    "transcribe": _check_transcribe,
+    "extract": _check_extract,
+    "ingest": _check_ingest,
+}
+
+
+# -------------------------
+# Worker loop
+# -------------------------
+def _heartbeat(job_id: int, worker: str, done: threading.Event) -> None:
+    """
+    Renews the lease every third of JOB_LEASE_SECONDS until `done` is set. Stops
+    if the lease was lost; the job's next commit then raises LeaseLost.
+    """
+    conn = connect()
+    try:
+        while not done.wait(JOB_LEASE_SECONDS / 3):
+            try:
+                if not renew_job_lease(conn, job_id, worker, JOB_LEASE_SECONDS):
+                    return
+            except sqlite3.OperationalError as e:  # e.g. database is locked; retry next beat
+                log.warning("Job %s: lease renewal failed: %s", job_id, e)
+    finally:
+        conn.close()
+
+
+def run_job(conn: sqlite3.Connection, job: Dict[str, Any], worker: str) -> None:
+    job_id = job["job_id"]
+    done = threading.Event()
+    beat = threading.Thread(target=_heartbeat, args=(job_id, worker, done), daemon=True)
+    beat.start()
+    t0 = time.perf_counter()
+    try:
+        validate_job(job["kind"], job["payload"])  # the input dir may have changed since it was queued
+        result = JOB_KINDS[job["kind"]](JobContext(conn, job_id, worker), job["payload"])
+        result["seconds"] = round(time.perf_counter() - t0, 3)
+        if not finish_job(conn, job_id, worker, result):
+            raise LeaseLost(f"job {job_id} is no longer held by {worker}")
+        conn.commit()
+        log.info("Job %s (%s) done in %.1fs", job_id, job["kind"], result["seconds"])
+    except LeaseLost as e:
+        rollback(conn)
+        log.warning("Job %s: %s; abandoning it", job_id, e)
+    except Exception as e:
+        rollback(conn)
+        # bad input won't get better on a retry
+        retry = not isinstance(e, JobInputError)
+        if retry:
+            log.exception("Job %s failed", job_id)
+        else:
+            log.warning("Job %s failed: %s: %s", job_id, type(e).__name__, e)
+        fail_job(conn, job_id, worker, f"{type(e).__name__}: {e}", retry=retry)
+        conn.commit()
+    finally:
+        done.set()
+        beat.join()
+
+
+def worker_loop(name: str, stop: Any) -> None:
+    """Claims and runs jobs until `stop` (a threading/multiprocessing Event) is set."""
+    worker = f"{socket.gethostname()}:{os.getpid()}:{name}"
+    conn = connect()
+    log.info("Job worker %s started", worker)
+    try:
+        while not stop.is_set():
+            try:
+                job = claim_job(conn, worker, JOB_LEASE_SECONDS)
+            except sqlite3.OperationalError as e:  # locked by a long writer; try again shortly
+                log.warning("Job worker %s: claim failed: %s", worker, e)
+                job = None
+            if job is None:
+                stop.wait(JOB_POLL_SECONDS)
+                continue
+            log.info("Job %s (%s) claimed by %s, attempt %s", job["job_id"], job["kind"], worker, job["attempts"])
+            run_job(conn, job, worker)
+    finally:
+        conn.close()
+
+
+# -------------------------
+# Worker processes
+# -------------------------
+def _worker_main(name: str, stop: Any) -> None:
+    # Ctrl+C goes to the whole process group; let the parent decide when we stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # a spawned process starts with no handlers; keep the workers' log visible
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    worker_loop(name, stop)
+
+
+def start_workers(n: int = JOB_WORKERS) -> None:
+    """Spawns n worker processes (no-op if already running or n <= 0)."""
+    global _STOP
+    if _PROCS or n <= 0:
+        return
+    ctx = multiprocessing.get_context("spawn")
+    _STOP = ctx.Event()
+    for i in range(n):
+        p = ctx.Process(target=_worker_main, args=(f"w{i}", _STOP), name=f"rayburn-job-worker-{i}", daemon=True)
+        p.start()
+        _PROCS.append(p)
+
+
+def stop_workers(timeout: float = 10.0) -> None:
+    """
+    Asks workers to stop after their current job; ones still busy after
+    `timeout` are terminated (their job's lease expires and it is retried).
+    """
+    if _STOP is not None:
+        _STOP.set()
+    deadline = time.monotonic() + timeout
+    for p in _PROCS:
+        p.join(max(0.0, deadline - time.monotonic()))
+        if p.is_alive():
+            p.terminate()
+            p.join()
+    _PROCS.clear()
+
+
+def workers_alive() -> int:
+    return sum(p.is_alive() for p in _PROCS)
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run background job workers (transcribe / extract / ingest)")
+    parser.add_argument("--workers", type=int, default=max(1, JOB_WORKERS), help="Worker processes.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    init_db()
+    start_workers(args.workers)
+    try:
+        while any(p.is_alive() for p in _PROCS):
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        log.info("Stopping workers after their current job…")
+    finally:
+        stop_workers(timeout=JOB_LEASE_SECONDS)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+# backend/ramps_sync.py
+"""
+Keeps the local `ramps` table in step with the ArcGIS access-points layer.
+
+A sync first asks the layer for its metadata (with If-None-Match when we have
+an ETag) and stops there if neither the ETag nor editingInfo.lastEditDate moved.
+Otherwise it pages through /query with resultOffset. If the layer exposes an
+edit-date field, and we have synced before, it only pulls features edited since
+the last sync; it then also fetches the layer's current object ids (one
+returnIdsOnly request) and prunes ramps deleted upstream. Afterwards the
+gzip-compressed GeoJSON that /api/ramps serves is rebuilt.
+"""
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+import http_clients
+from db import (
+    delete_ramps_except,
+    get_geojson_blob,
+    get_pool,
+    get_sync_state,
+    now_iso,
+    rebuild_ramps_geojson,
+    save_sync_state,
+    upsert_ramp,
+)
+
+RAMPS_SYNC_SECONDS = int(os.getenv("RAYBURN_RAMPS_SYNC_SECONDS", str(60 * 60)))
+RAMPS_PAGE_SIZE = int(os.getenv("RAYBURN_RAMPS_PAGE_SIZE", "1000"))
+
+log = logging.getLogger(__name__)
+
+_SYNC_LOCK: Optional[asyncio.Lock] = None
+_TASK: Optional["asyncio.Task[None]"] = None
+
+
+class RampSyncError(RuntimeError):
+    pass
+
+
+def layer_url() -> str:
+    """Validated RAYBURN_ACCESS_POINTS_LAYER_URL; raises ValueError with a readable message."""
+    url = os.getenv("RAYBURN_ACCESS_POINTS_LAYER_URL", "").strip()
+    if not url:
+        raise ValueError("Missing RAYBURN_ACCESS_POINTS_LAYER_URL in backend environment")
+
+    # IMPORTANT: you need the /0 at the end of your FeatureServer URL
+    # Example:
+    # https://services3.arcgis.com/.../arcgis/rest/services/Rayburn_Access_Points/FeatureServer/0
+    if url.endswith("/FeatureServer") or url.endswith("/FeatureServer/"):
+        raise ValueError("RAYBURN_ACCESS_POINTS_LAYER_URL must end with /0 (layer 0), not the service root.")
+    return url.rstrip("/")
+
+
+def _ramp_row(feature: Dict[str, Any], oid_field: str) -> Optional[Dict[str, Any]]:
+    props = feature.get("properties") or {}
+    ramp_id = feature.get("id", props.get(oid_field))
+    if ramp_id is None:
+        return None
+
+    lat = lng = None
+    geom = feature.get("geometry") or {}
+    if geom.get("type") == "Point" and len(geom.get("coordinates") or []) >= 2:
+        lng, lat = geom["coordinates"][:2]
+
+    return {
+        "ramp_id": str(ramp_id),
+        "name": props.get("Name") or props.get("NAME") or props.get("Title") or "Access Point",
+        "lat": lat,
+        "lng": lng,
+        "ramp_type": props.get("Type") or props.get("TYPE"),
+        "raw_json": json.dumps(feature, ensure_ascii=False, separators=(",", ":")),
+    }
+
+
+def _arcgis_timestamp(epoch_ms: int) -> str:
+    dt = datetime.fromtimestamp(epoch_ms / 1000, tz=timezone.utc)
+    return dt.strftime("timestamp '%Y-%m-%d %H:%M:%S'")
+
+
+async def _fetch_features(url: str, where: str, oid_field: str) -> List[Dict[str, Any]]:
+    features: List[Dict[str, Any]] = []
+    offset = 0
+    while True:
+        r = await http_clients.request(
+            "arcgis",
+            "GET",
+            f"{url}/query",
+            params={
+                "where": where,
+                "outFields": "*",
+                "outSR": "4326",
+                "f": "geojson",
+                "orderByFields": oid_field,
+                "resultOffset": offset,
+                "resultRecordCount": RAMPS_PAGE_SIZE,
+            },
+        )
+        if r.status_code != 200:
+            raise RampSyncError(f"ArcGIS query failed: HTTP {r.status_code}")
+
+        page = r.json()
+        if "error" in page:
+            raise RampSyncError(f"ArcGIS query failed: {page['error']}")
+
+        batch = page.get("features") or []
+        features.extend(batch)
+        exceeded = page.get("exceededTransferLimit") or (page.get("properties") or {}).get("exceededTransferLimit")
+        if not batch or not exceeded:
+            return features
+        offset += len(batch)
+
+
+async def _fetch_object_ids(url: str) -> List[str]:
+    """Every object id currently in the layer (ids only, so not subject to paging)."""
+    r = await http_clients.request(
+        "arcgis", "GET", f"{url}/query", params={"where": "1=1", "returnIdsOnly": "true", "f": "json"}
+    )
+    if r.status_code != 200:
+        raise RampSyncError(f"ArcGIS id query failed: HTTP {r.status_code}")
+    page = r.json()
+    if "error" in page or "objectIds" not in page:
+        raise RampSyncError(f"ArcGIS id query failed: {page.get('error', 'no objectIds in response')}")
+    return [str(i) for i in page["objectIds"] or []]
+
+
+def _store(
+    rows: List[Dict[str, Any]], keep_ids: Optional[List[str]], etag: Optional[str], last_edit: Optional[int]
+) -> Tuple[int, int]:
+    """Upserts rows, deletes every ramp not in keep_ids (None = keep all). Returns (features, pruned)."""
+    with get_pool().writer() as conn:
+        for row in rows:
+            upsert_ramp(conn, row)
+        pruned = delete_ramps_except(conn, keep_ids) if keep_ids is not None else 0
+        count = rebuild_ramps_geojson(conn)
+        now = now_iso()
+        save_sync_state(conn, "ramps", etag=etag, last_edit=last_edit, synced_at=now, checked_at=now)
+    return count, pruned
+
+
+def _touch(etag: Optional[str]) -> None:
+    with get_pool().writer() as conn:
+        save_sync_state(conn, "ramps", etag=etag, checked_at=now_iso())
+
+
+def _load_state() -> Optional[Dict[str, Any]]:
+    with get_pool().reader() as conn:
+        state = get_sync_state(conn, "ramps")
+        has_blob = get_geojson_blob(conn, "ramps") is not None
+    # a state row without a blob (e.g. blob table wiped) means "never synced"
+    return state if has_blob else None
+
+
+async def sync_ramps(force: bool = False) -> Dict[str, Any]:
+    """
+    Pulls the ArcGIS layer into `ramps`. Returns a small report:
+    {"changed": bool, "mode": "full"|"incremental"|"unchanged", "fetched": n, "pruned": n, "features": n}
+    """
+    global _SYNC_LOCK
+    url = layer_url()
+    if _SYNC_LOCK is None:
+        _SYNC_LOCK = asyncio.Lock()
+    async with _SYNC_LOCK:
+        state = None if force else await run_in_threadpool(_load_state)
+
+        headers = {}
+        if state and state.get("etag"):
+            headers["If-None-Match"] = state["etag"]
+        r = await http_clients.request("arcgis", "GET", url, params={"f": "json"}, headers=headers)
+        if r.status_code == 304:
+            await run_in_threadpool(_touch, state["etag"])
+            return {"changed": False, "mode": "unchanged", "fetched": 0}
+        if r.status_code != 200:
+            raise RampSyncError(f"ArcGIS layer metadata failed: HTTP {r.status_code}")
+
+        meta = r.json()
+        etag = r.headers.get("ETag")
+        last_edit = (meta.get("editingInfo") or {}).get("lastEditDate")
+        if state and last_edit and state.get("last_edit") == last_edit:
+            await run_in_threadpool(_touch, etag)
+            return {"changed": False, "mode": "unchanged", "fetched": 0}
+
+        oid_field = meta.get("objectIdField") or "OBJECTID"
+        edit_field = (meta.get("editFieldsInfo") or {}).get("editDateField")
+        incremental = bool(state and state.get("last_edit") and edit_field)
+        where = f"{edit_field} > {_arcgis_timestamp(state['last_edit'])}" if incremental else "1=1"
+
+        features = await _fetch_features(url, where, oid_field)
+        rows = [row for row in (_ramp_row(f, oid_field) for f in features) if row]
+        # edits-since queries can't see deletions; the id list can
+        keep_ids = await _fetch_object_ids(url) if incremental else [r["ramp_id"] for r in rows]
+        count, pruned = await run_in_threadpool(_store, rows, keep_ids, etag, last_edit)
+        return {
+            "changed": True,
+            "mode": "incremental" if incremental else "full",
+            "fetched": len(rows),
+            "pruned": pruned,
+            "features": count,
+        }
+
+
+async def _sync_forever() -> None:
+    while True:
+        try:
+            report = await sync_ramps()
+            if report["changed"]:
+                log.info("Ramps sync: %s", report)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log.warning("Ramps sync failed: %s", e)
+        await asyncio.sleep(RAMPS_SYNC_SECONDS)
+
+
+def start_background_sync() -> None:
+    global _TASK
+    if _TASK is None and RAMPS_SYNC_SECONDS > 0 and os.getenv("RAYBURN_ACCESS_POINTS_LAYER_URL", "").strip():
+        _TASK = asyncio.get_running_loop().create_task(_sync_forever())
+
+
+async def stop_background_sync() -> None:
+    global _TASK
+    if _TASK is not None:
+        _TASK.cancel()
+        try:
+            await _TASK
+        except asyncio.CancelledError:
+            pass
+        _TASK = None
@@ -0,0 +1,262 @@
+# backend/responses.py
+"""
+Response encoding: orjson serialization, negotiated gzip/brotli compression,
+and precompressed bodies for the versioned read endpoints.
+
+- ORJSONResponse is the app's default response class. It also accepts
+  sqlite3.Row values (as objects keyed by column name): each row is turned
+  into a dict only while it is being encoded, so a result isn't held twice.
+  Only the columns layout (iter_json_columns) encodes rows with no dict at all.
+- CompressionMiddleware compresses responses over COMPRESS_MIN_BYTES with
+  the best encoding the client accepts (br, then gzip). Brotli is optional:
+  without the `brotli` package only gzip is offered. Responses that already
+  carry a Content-Encoding, and event streams, pass through untouched.
+- iter_json_array()/iter_json_columns() encode a db.stream_rows() result
+  chunk by chunk for StreamingResponse, so exports never hold the whole
+  result (or its JSON) in memory.
+- cached_json()/cached_body() serve a body keyed by (URL, ETag). The ETag
+  comes from data_versions (see http_caching.py), so a cached body stays
+  valid until the data changes, and every client polling after a write
+  shares one query, one serialization and one compression per encoding.
+"""
+import gzip
+import os
+import sqlite3
+import time
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import orjson
+from fastapi import Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from starlette.middleware.gzip import GZipResponder, IdentityResponder
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from cache import LRUCache
+from http_caching import Validator
+
+try:
+    import brotli
+except ImportError:  # optional; gzip only
+    brotli = None
+
+COMPRESS_MIN_BYTES = int(os.getenv("RAYBURN_COMPRESS_MIN_BYTES", "1024"))
+# on-the-fly levels favour speed; cached bodies are compressed once, so harder
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+GZIP_CACHED_LEVEL = 9
+BROTLI_CACHED_QUALITY = 9
+
+BODY_CACHE_MAX_ENTRIES = int(os.getenv("RAYBURN_BODY_CACHE_MAX_ENTRIES", "512"))
+BODY_CACHE_MAX_BYTES = int(os.getenv("RAYBURN_BODY_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+BODY_CACHE_TTL_SECONDS = 60 * 60  # only to age out keys nobody asks for any more
+
+
+# -------------------------
+# JSON
+# -------------------------
+def _default(obj: Any) -> Any:
+    if isinstance(obj, sqlite3.Row):
+        return dict(zip(obj.keys(), obj))
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, bytes):
+        return obj.decode("utf-8", "replace")
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class ORJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+# -------------------------
+# Streaming arrays
+# -------------------------
+STREAM_CHUNK_ROWS = 1000  # rows per encoded chunk
+
+
+def _chunks(rows: Iterable[Tuple[Any, ...]], size: int) -> Iterator[List[Tuple[Any, ...]]]:
+    it = iter(rows)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _join_chunks(head: bytes, tail: bytes, encoded: Iterator[bytes]) -> Iterator[bytes]:
+    # each encoded chunk is a JSON array; splice their items into one
+    yield head
+    sep = b""
+    for body in encoded:
+        yield sep + body[1:-1]
+        sep = b","
+    yield tail
+
+
+def iter_json_array(columns: List[str], rows: Iterable[Tuple[Any, ...]], chunk_rows: int = STREAM_CHUNK_ROWS) -> Iterator[bytes]:
+    """[{col: value, ...}, ...]; one chunk of rows (and their dicts) is materialized at a time."""
+    encoded = (dumps([dict(zip(columns, r)) for r in chunk]) for chunk in _chunks(rows, chunk_rows))
+    return _join_chunks(b"[", b"]", encoded)
+
+
+def iter_json_columns(columns: List[str], rows: Iterable[Tuple[Any, ...]], chunk_rows: int = STREAM_CHUNK_ROWS) -> Iterator[bytes]:
+    """{"columns": [...], "rows": [[...], ...]}: the names once, each row's tuple encoded as-is."""
+    encoded = (dumps(chunk) for chunk in _chunks(rows, chunk_rows))
+    return _join_chunks(b'{"columns":' + dumps(columns) + b',"rows":[', b"]}", encoded)
+
+
+# -------------------------
+# Content negotiation
+# -------------------------
+def available_encodings() -> tuple:
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate_encoding(accept_encoding: str) -> str:
+    """
+    Picks "br", "gzip" or "identity" from an Accept-Encoding header, honouring
+    q-values (q=0 refuses); on a tie the server prefers br.
+    """
+    prefs: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.partition(";")
+        name = name.strip()
+        if not name:
+            continue
+        q = 1.0
+        for p in params.split(";"):
+            k, _, val = p.strip().partition("=")
+            if k == "q":
+                try:
+                    q = float(val)
+                except ValueError:
+                    q = 0.0
+        prefs[name] = q
+
+    best, best_q = "identity", 0.0
+    for enc in available_encodings():
+        q = prefs.get(enc, prefs.get("*", 0.0))
+        if q > best_q:
+            best, best_q = enc, q
+    return best
+
+
+def compress(body: bytes, encoding: str, cached: bool = False) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_CACHED_QUALITY if cached else BROTLI_QUALITY)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=GZIP_CACHED_LEVEL if cached else GZIP_LEVEL, mtime=0)
+    return body
+
+
+# -------------------------
+# Middleware
+# -------------------------
+class BrotliResponder(IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app: ASGIApp, minimum_size: int, thread_minimum_size: int = 128 * 1024) -> None:
+        super().__init__(app, minimum_size)
+        self.thread_minimum_size = thread_minimum_size
+        self.compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    async def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        # like GZipResponder: big chunks would block the event loop
+        if len(body) >= self.thread_minimum_size:
+            return await run_in_threadpool(self._compress_body, body, more_body)
+        return self._compress_body(body, more_body)
+
+    def _compress_body(self, body: bytes, more_body: bool) -> bytes:
+        out = self.compressor.process(body)
+        return out + (self.compressor.flush() if more_body else self.compressor.finish())
+
+
+class CompressionMiddleware:
+    """
+    Starlette's GZipMiddleware with brotli added: negotiates the encoding per
+    request and reuses Starlette's responders for the buffering, minimum
+    size, Vary and already-encoded checks (event streams are among the
+    excluded content types, so SSE is never buffered).
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESS_MIN_BYTES) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept = ""
+        for k, v in scope["headers"]:
+            if k == b"accept-encoding":
+                accept = v.decode("latin-1")
+                break
+
+        encoding = negotiate_encoding(accept)
+        responder: IdentityResponder
+        if encoding == "br":
+            responder = BrotliResponder(self.app, self.minimum_size)
+        elif encoding == "gzip":
+            responder = GZipResponder(self.app, self.minimum_size, compresslevel=GZIP_LEVEL)
+        else:
+            # nothing to encode; versioned responses already carry Vary
+            await self.app(scope, receive, send)
+            return
+        await responder(scope, receive, send)
+
+
+# -------------------------
+# Precompressed bodies
+# -------------------------
+BODIES = LRUCache(BODY_CACHE_MAX_ENTRIES, BODY_CACHE_MAX_BYTES)
+
+
+def cached_body(
+    request: Request,
+    v: Validator,
+    build: Callable[[], bytes],
+    media_type: str = "application/json",
+    gzip_body: Optional[bytes] = None,
+) -> Response:
+    """
+    The body for this URL at v's ETag in the client's preferred encoding,
+    building and compressing it only on the first request per version and
+    encoding. `build` returns the identity body; `gzip_body` seeds the gzip
+    variant when the caller already has one (e.g. the stored ramps blob).
+    """
+    key = f"{request.url.path}?{request.url.query}|{v.etag}"
+    found = BODIES.get(key, BODY_CACHE_TTL_SECONDS)
+    variants: Dict[str, bytes] = dict(found[0]) if found else {}
+    changed = False
+
+    if "identity" not in variants:
+        variants["identity"] = build()
+        changed = True
+    identity = variants["identity"]
+
+    encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+    if len(identity) < COMPRESS_MIN_BYTES:
+        encoding = "identity"
+    if encoding not in variants:
+        variants[encoding] = gzip_body if encoding == "gzip" and gzip_body else compress(identity, encoding, cached=True)
+        changed = True
+
+    if changed:
+        BODIES.put(key, variants, time.time(), sum(len(b) for b in variants.values()), BODY_CACHE_TTL_SECONDS)
+
+    headers = {} if encoding == "identity" else {"Content-Encoding": encoding}
+    return v.apply(Response(variants[encoding], media_type=media_type, headers=headers))
+
+
+def cached_json(request: Request, v: Validator, build: Callable[[], Any]) -> Response:
+    """cached_body() for a JSON-serializable result."""
+    return cached_body(request, v, lambda: dumps(build()))
@@ -8,15 +8,34 @@ if str(ROOT_DIR) not in sys.path:
     sys.path.insert(0, str(ROOT_DIR))
 
 import argparse
+import glob as globmod
+import hashlib
 import json
-import re
-import subprocess
-from dataclasses import dataclass
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
 from datetime import datetime, UTC
-from typing import Dict, List, Tuple, Optional
-
-from baits import BAIT_DICTIONARY
-from db import connect, insert_bait_hits
+from typing import Any, Callable, Dict, List, Tuple, Optional, Union
+
+import audio
+from artifacts import ArtifactStore, artifact_key, get_store
+from baits import BAIT_ALIASES, BAIT_TAXONOMY, AliasMatcher, alias_table_hash, alias_versions, get_alias_matcher, iter_alias_pairs
+from db import (
+    clear_bait_cache,
+    connect,
+    delete_bait_hits_for_baits,
+    ensure_video,
+    get_alias_versions,
+    get_stored_transcript,
+    get_transcript_hashes,
+    insert_bait_hits,
+    replace_bait_hits,
+    replace_transcript_segments,
+    save_alias_versions,
+    upsert_transcript,
+)
+from transcript import Transcript, read_transcript, write_transcript
 
 
 @dataclass
@@ -25,34 +44,8 @@ class BaitHit:
     keyword: str
     confidence: int
     excerpt: str
-
-
-def ensure_wav_16k_mono(input_path: Path, wav_out: Path) -> None:
-    """
-    Convert any media file (mp4/mp3/m4a/wav...) to 16kHz mono wav for stable Whisper input.
-    Requires ffmpeg installed system-wide.
-    """
-    wav_out.parent.mkdir(parents=True, exist_ok=True)
-    cmd = [
-        "ffmpeg",
-        "-y",
-        "-i",
-        str(input_path),
-        "-ar",
-        "16000",
-        "-ac",
-        "1",
-        "-c:a",
-        "pcm_s16le",
-        str(wav_out),
-    ]
-    subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
-
-
-def normalize_text(s: str) -> str:
-    s = (s or "").lower()
-    s = re.sub(r"\s+", " ", s)
-    return s.strip()
+    t_start: Optional[float] = None  # seconds, first occurrence
+    t_end: Optional[float] = None
 
 
 def make_excerpt(text: str, idx: int, window: int = 60) -> str:
@@ -61,68 +54,377 @@ def make_excerpt(text: str, idx: int, window: int = 60) -> str:
     return text[start:end].strip()
 
 
-def extract_baits(full_text: str, bait_dict: Dict[str, List[str]]) -> List[BaitHit]:
+def extract_baits(
+    full_text: Union[str, Transcript],
+    bait_dict: Dict[str, List[str]] = BAIT_ALIASES,
+    matcher: Optional[AliasMatcher] = None,
+) -> List[BaitHit]:
     """
     Simple, explainable extractor:
-    - searches for dictionary keywords
+    - scans the transcript once with a compiled alias matcher (word-boundary aware)
     - creates short evidence excerpts
     - sets confidence based on keyword specificity + repetition (basic scoring)
+    - maps each hit's first occurrence to cue times when the transcript has timestamps
+    A prebuilt `matcher` takes precedence over `bait_dict`.
     """
-    text = normalize_text(full_text)
-    hits: List[BaitHit] = []
-    seen: set[Tuple[str, str]] = set()
+    transcript = full_text if isinstance(full_text, Transcript) else Transcript.from_text(full_text)
+    text = transcript.text
 
-    # Count occurrences of each keyword
-    keyword_counts: Dict[str, int] = {}
-    for bait, keywords in bait_dict.items():
+    if matcher is not None:
+        pass
+    elif bait_dict is BAIT_ALIASES:
+        matcher = get_alias_matcher()
+    else:
         # allow dict to contain non-list values safely (ignore those)
-        if not isinstance(keywords, list):
-            continue
-        for kw in keywords:
-            kw_n = normalize_text(kw)
-            if not kw_n:
-                continue
-            keyword_counts[kw_n] = text.count(kw_n)
+        matcher = AliasMatcher(
+            (bait, kw) for bait, keywords in bait_dict.items() if isinstance(keywords, list) for kw in keywords
+        )
+
+    # One pass: first position + occurrence count per (bait, keyword)
+    first_pos: Dict[Tuple[str, str], Tuple[int, int]] = {}
+    keyword_counts: Dict[Tuple[str, str], int] = {}
+    for start, end, bait, kw_n in matcher.find_all(text):
+        key = (bait, kw_n)
+        if key not in first_pos:
+            first_pos[key] = (start, end)
+        keyword_counts[key] = keyword_counts.get(key, 0) + 1
 
-    for bait, keywords in bait_dict.items():
-        if not isinstance(keywords, list):
-            continue
-        for kw in keywords:
-            kw_n = normalize_text(kw)
-            if not kw_n:
-                continue
-
-            pos = text.find(kw_n)
-            if pos == -1:
-                continue
-
-            key = (bait, kw_n)
-            if key in seen:
-                continue
-            seen.add(key)
-
-            # Confidence scoring (MVP)
-            count = keyword_counts.get(kw_n, 1)
-            base = 65
-            if len(kw_n) >= 10:
-                base += 10  # more specific phrase
-            if count >= 2:
-                base += 10
-            if count >= 4:
-                base += 5
-            conf = min(95, base)
-
-            excerpt = make_excerpt(text, pos)
-            hits.append(BaitHit(bait=bait, keyword=kw, confidence=conf, excerpt=excerpt))
+    hits: List[BaitHit] = []
+    for (bait, kw_n), (pos, end) in first_pos.items():
+        # Confidence scoring (MVP)
+        count = keyword_counts[(bait, kw_n)]
+        base = 65
+        if len(kw_n) >= 10:
+            base += 10  # more specific phrase
+        if count >= 2:
+            base += 10
+        if count >= 4:
+            base += 5
+        conf = min(95, base)
+
+        excerpt = make_excerpt(text, pos)
+        t_start, t_end = transcript.span(pos, end)
+        hits.append(
+            BaitHit(bait=bait, keyword=kw_n, confidence=conf, excerpt=excerpt, t_start=t_start, t_end=t_end)
+        )
 
     hits.sort(key=lambda h: (-h.confidence, h.bait))
     return hits
 
 
-def read_text_file(p: Path) -> str:
+def extract_baits_cached(
+    load: Callable[[], Transcript], content_sha: str, store: Optional[ArtifactStore]
+) -> Tuple[List[BaitHit], bool]:
+    """
+    extract_baits() for the transcript with content hash `content_sha`, reusing a
+    stored result when neither the transcript nor BAIT_ALIASES changed.
+    Returns (hits, from_cache); `load` is only called on a miss.
+    """
+    key = artifact_key("extraction", content_sha, aliases=alias_table_hash())
+    cached = store.get_json("extraction", key) if store is not None else None
+    if cached is not None:
+        return [BaitHit(**h) for h in cached], True
+
+    hits = extract_baits(load(), BAIT_ALIASES)
+    if store is not None:
+        store.put_json("extraction", key, [asdict(h) for h in hits])
+    return hits, False
+
+
+def transcribe_media_cached(media_path: Path, media_sha: str, args, store: Optional[ArtifactStore]) -> Tuple[List, str]:
+    """
+    Speech-to-text for a media file, reusing stored segments for the same
+    media + backend/model/chunking, else the stored 16 kHz WAV (skipping
+    ffmpeg), else decoding from scratch. Returns (segments, segments_key).
+    """
+    seg_key = artifact_key(
+        "segments", media_sha, backend=args.backend, model=args.model, chunk_seconds=args.chunk_seconds
+    )
+
+    def run(blocks) -> List:
+        return audio.transcribe_media(
+            media_path,
+            workers=args.workers,
+            backend=args.backend,
+            model=args.model,
+            max_chunk_seconds=args.chunk_seconds,
+            pcm_blocks=blocks,
+        )
+
+    if store is None:
+        return run(None), seg_key
+
+    cached = store.get_json("segments", seg_key)
+    if cached is not None:
+        print("   segments: cached")
+        return [tuple(s) for s in cached], seg_key
+
+    audio_key = artifact_key("audio", media_sha, sample_rate=audio.SAMPLE_RATE, ffmpeg=audio.ffmpeg_version())
+    wav = store.get_path("audio", audio_key, ".wav")
+    if wav is not None:
+        print("   audio: cached (skipping ffmpeg)")
+        segments = run(audio.read_wav(wav))
+    else:
+        with store.writing("audio", audio_key, ".wav") as tmp:
+            segments = run(audio.tee_wav(audio.stream_pcm(media_path), tmp))
+
+    store.put_json("segments", seg_key, segments)
+    return segments, seg_key
+
+
+def read_text_file(p: Path) -> Transcript:
     if not p.exists():
         raise SystemExit(f"Transcript file not found: {p}")
-    return p.read_text(encoding="utf-8", errors="ignore")
+    return read_transcript(p)
+
+
+def hits_to_db(hits: List[BaitHit]) -> List[Dict[str, Any]]:
+    return [
+        {
+            "bait_name": h.bait,       # canonical bucket (e.g., "crankbait")
+            "category": (BAIT_TAXONOMY.get(h.bait) or {}).get("category"),
+            "bait_text": h.keyword,    # matched phrase
+            "snippet": h.excerpt,      # evidence excerpt
+            "t_start": h.t_start,
+            "t_end": h.t_end,
+            "confidence": h.confidence,
+        }
+        for h in hits
+    ]
+
+
+def file_sha256(p: Path) -> str:
+    digest = hashlib.sha256()
+    with open(p, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def store_extraction(
+    conn,
+    video_id: str,
+    sha: str,
+    source: str,
+    db_hits: List[Dict[str, Any]],
+    transcript: Optional[Transcript] = None,
+) -> int:
+    """
+    Writes one transcript's hits. Makes sure the video row exists (bait_hits has
+    a FK to videos), then replaces the video's hits with this extraction, so
+    re-running the same or an edited transcript never leaves stale or doubled
+    hits. The transcript text and packed cue index are kept for --reextract,
+    and its passages are (re)indexed for full-text search.
+    """
+    ensure_video(conn, video_id, source="transcript")
+    row = {"video_id": video_id, "content_sha256": sha, "source": source}
+    if transcript is not None:
+        row.update(text=transcript.text, cues=transcript.pack_cues())
+    upsert_transcript(conn, row)
+    if transcript is not None:
+        replace_transcript_segments(conn, video_id, transcript.segments())
+    return replace_bait_hits(conn, video_id, db_hits)
+
+
+# -------------------------
+# Batch mode: many transcripts, parallel extraction, one writer
+# -------------------------
+def _extract_file(job: Tuple[str, str, str, bool]) -> Dict[str, Any]:
+    """Worker: (path, video_id, sha, use_cache) -> result dict. Never raises."""
+    path, video_id, sha, use_cache = job
+    t0 = time.perf_counter()
+    try:
+        # Always read: the text is stored with the hits even when extraction is cached
+        transcript = read_transcript(Path(path))
+        hits, cached = extract_baits_cached(lambda: transcript, sha, get_store() if use_cache else None)
+        return {
+            "path": path,
+            "video_id": video_id,
+            "sha256": sha,
+            "chars": len(transcript.text),
+            "transcript": transcript,
+            "cached": cached,
+            "hits": hits_to_db(hits),
+            "seconds": time.perf_counter() - t0,
+        }
+    except Exception as e:
+        return {"path": path, "video_id": video_id, "sha256": sha, "error": f"{type(e).__name__}: {e}"}
+
+
+def collect_batch_inputs(pattern: Optional[str], manifest: Optional[str]) -> List[Tuple[Path, str]]:
+    """
+    Resolves --batch (a directory or glob) and/or --manifest into (path, video_id) pairs.
+    Manifest lines are `path` or `path,video_id`; blank lines and # comments are skipped,
+    relative paths are resolved against the manifest's folder.
+    """
+    items: List[Tuple[Path, str]] = []
+    if pattern:
+        p = Path(pattern).expanduser()
+        if p.is_dir():
+            paths = sorted(p.glob("*.txt"))
+        else:
+            paths = sorted(Path(x) for x in globmod.glob(str(p), recursive=True))
+        items += [(x.resolve(), x.stem) for x in paths if x.is_file()]
+
+    if manifest:
+        mpath = Path(manifest).expanduser().resolve()
+        for line in mpath.read_text(encoding="utf-8").splitlines():
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            raw_path, _, vid = line.partition(",")
+            fp = Path(raw_path.strip()).expanduser()
+            if not fp.is_absolute():
+                fp = mpath.parent / fp
+            items.append((fp.resolve(), vid.strip() or fp.stem))
+    return items
+
+
+def run_batch(args) -> None:
+    inputs = collect_batch_inputs(args.batch, args.manifest)
+    if not inputs:
+        raise SystemExit("No transcript files matched --batch/--manifest.")
+
+    outdir = Path(args.outdir).expanduser().resolve()
+    outdir.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now(UTC).strftime("%Y%m%d_%H%M%S")
+    out_path = outdir / f"batch_{stamp}.ndjson"
+
+    t0 = time.perf_counter()
+    conn = None if args.no_db else connect()
+    done_hashes = get_transcript_hashes(conn) if conn is not None and not args.force else {}
+
+    # Resume: skip content we've already ingested (and duplicates within this run)
+    jobs: List[Tuple[str, str, str, bool]] = []
+    skipped = 0
+    for path, video_id in inputs:
+        if not path.exists():
+            print(f"⚠️ Missing: {path}")
+            continue
+        sha = file_sha256(path)
+        if sha in done_hashes:
+            skipped += 1
+            continue
+        done_hashes[sha] = video_id
+        jobs.append((str(path), video_id, sha, not args.no_cache))
+
+    print(f"Batch: {len(inputs)} inputs, {len(jobs)} to extract, {skipped} already ingested, workers={args.workers}")
+
+    ok = failed = total_hits = total_chars = inserted = from_cache = 0
+    pending: List[Dict[str, Any]] = []
+
+    def flush() -> None:
+        nonlocal inserted
+        if conn is None or not pending:
+            pending.clear()
+            return
+        for r in pending:
+            inserted += store_extraction(
+                conn, r["video_id"], r["sha256"], f"text:{Path(r['path']).name}", r["hits"], r["transcript"]
+            )
+        conn.commit()
+        pending.clear()
+
+    with open(out_path, "w", encoding="utf-8") as out, ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for r in pool.map(_extract_file, jobs, chunksize=max(1, min(32, len(jobs) // (args.workers * 4) or 1))):
+            if "error" in r:
+                failed += 1
+                print(f"⚠️ {r['path']}: {r['error']}")
+                continue
+            ok += 1
+            from_cache += r["cached"]
+            total_hits += len(r["hits"])
+            total_chars += r["chars"]
+            # Same {video, hits} shape as POST /api/baits/ingest(/stream)
+            out.write(json.dumps({"video": {"video_id": r["video_id"], "source": "transcript"}, "hits": r["hits"]}) + "\n")
+            pending.append(r)
+            if len(pending) >= args.commit_every:
+                flush()
+            if ok % 100 == 0:
+                print(f"  … {ok}/{len(jobs)} extracted")
+        flush()
+
+    if conn is not None:
+        conn.close()
+
+    elapsed = time.perf_counter() - t0
+    rate = ok / elapsed if elapsed > 0 else 0.0
+    print(f"✅ Batch done in {elapsed:.1f}s: {ok} extracted ({from_cache} from cache), {skipped} skipped, {failed} failed")
+    print(f"   {total_hits} bait hits ({inserted} inserted to DB), {total_chars / 1e6:.2f}M chars")
+    print(f"   throughput: {rate:.1f} transcripts/s, {total_chars / 1e6 / elapsed if elapsed > 0 else 0:.2f}M chars/s")
+    print(f"   results: {out_path}")
+
+
+# -------------------------
+# Re-extract mode: rescan stored transcripts for alias changes only
+# -------------------------
+def run_reextract(args) -> None:
+    """
+    Compares per-slug alias hashes with the ones the stored hits were made with.
+    Removed slugs lose their hits; added/changed slugs are rescanned (with a
+    matcher containing only those slugs) over every stored transcript and
+    their hits replaced. Hit confidence only depends on a slug's own aliases,
+    so this gives the same rows as a full re-extraction.
+    """
+    t0 = time.perf_counter()
+    current = alias_versions()
+    conn = connect()
+    try:
+        stored = get_alias_versions(conn)
+        changed = sorted(slug for slug, h in current.items() if stored.get(slug) != h)
+        removed = sorted(slug for slug in stored if slug not in current)
+        if not changed and not removed:
+            print("✅ Aliases unchanged since last re-extract; nothing to do.")
+            return
+        print(f"Re-extract: {len(changed)} added/changed slugs {changed}, {len(removed)} removed {removed}")
+
+        deleted = delete_bait_hits_for_baits(conn, removed)
+        video_ids = [r[0] for r in conn.execute("SELECT video_id FROM transcripts ORDER BY video_id")]
+        wanted = set(changed)
+        matcher = AliasMatcher(pair for pair in iter_alias_pairs() if pair[0] in wanted)
+
+        scanned = missing_text = inserted = 0
+        for i, video_id in enumerate(video_ids if changed else [], 1):
+            row = get_stored_transcript(conn, video_id)
+            if not row or row["text"] is None:
+                missing_text += 1
+                continue
+            transcript = Transcript.from_packed(row["text"], row["cues"])
+            hits = extract_baits(transcript, matcher=matcher)
+            deleted += delete_bait_hits_for_baits(conn, changed, video_id)
+            inserted += insert_bait_hits(conn, video_id, hits_to_db(hits))
+            scanned += 1
+            if i % args.commit_every == 0:
+                conn.commit()
+
+        save_alias_versions(conn, current)
+        conn.commit()
+    finally:
+        conn.close()
+
+    print(f"✅ Re-extract done in {time.perf_counter() - t0:.1f}s: {scanned} transcripts rescanned")
+    print(f"   {deleted} hits deleted, {inserted} hits inserted")
+    if missing_text:
+        print(f"⚠️ {missing_text} transcripts have no stored text (ingested before it was kept);")
+        print("   re-run them with --batch ... --force to store it.")
+
+
+def run_reindex_search(args) -> None:
+    """Rebuilds the full-text passages of every stored transcript (e.g. after upgrading an existing DB)."""
+    t0 = time.perf_counter()
+    conn = connect()
+    try:
+        video_ids = [r[0] for r in conn.execute("SELECT video_id FROM transcripts WHERE text IS NOT NULL")]
+        passages = 0
+        for i, video_id in enumerate(video_ids, 1):
+            row = get_stored_transcript(conn, video_id)
+            passages += replace_transcript_segments(conn, video_id, Transcript.from_packed(row["text"], row["cues"]).segments())
+            if i % args.commit_every == 0:
+                conn.commit()
+        conn.commit()
+    finally:
+        conn.close()
+    print(f"✅ Indexed {passages} passages from {len(video_ids)} transcripts in {time.perf_counter() - t0:.1f}s")
 
 
 def main():
@@ -148,40 +450,141 @@ def main():
         help="Skip writing bait hits to SQLite (JSON output still written).",
     )
 
-    # Optional legacy path: accept a positional media input (we won't whisper in this version)
+    # Media mode: decode + speech-to-text, then the same extraction
     parser.add_argument(
         "input",
         nargs="?",
         default=None,
-        help="(Optional) Path to audio/video file. Not used for YouTube transcript mode.",
+        help="(Optional) Path to an audio/video file to transcribe (needs ffmpeg + a speech-to-text backend).",
+    )
+    parser.add_argument(
+        "--backend",
+        default=audio.DEFAULT_BACKEND,
+        choices=sorted(audio.BACKENDS),
+        help="Speech-to-text backend for media mode.",
+    )
+    parser.add_argument(
+        "--model",
+        default=audio.DEFAULT_MODEL,
+        help="Model name for the speech-to-text backend (e.g. tiny.en, base.en, small.en).",
+    )
+    parser.add_argument(
+        "--chunk-seconds",
+        type=float,
+        default=30.0,
+        help="Media mode: max audio chunk length; chunks are cut at the quietest point.",
+    )
+
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Don't read or write the artifact store (decoded audio, segments, extraction results).",
+    )
+
+    # Batch mode
+    parser.add_argument(
+        "--batch",
+        default=None,
+        help="Directory (all *.txt) or glob of transcripts to process in parallel, e.g. 'data/inbox/**/*.txt'.",
+    )
+    parser.add_argument(
+        "--manifest",
+        default=None,
+        help="File listing transcripts, one 'path' or 'path,video_id' per line (batch mode).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 2,
+        help="Worker processes for batch extraction / media transcription (default: CPU count).",
+    )
+    parser.add_argument(
+        "--commit-every",
+        type=int,
+        default=50,
+        help="Transcripts per DB transaction in batch / re-extract mode.",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Batch mode: re-extract files even if their content hash was already ingested.",
+    )
+
+    parser.add_argument(
+        "--reextract",
+        action="store_true",
+        help="Rescan stored transcripts for aliases added/changed/removed since the last re-extract.",
+    )
+
+    parser.add_argument(
+        "--reindex-search",
+        action="store_true",
+        help="Rebuild the full-text search passages from stored transcripts.",
     )
 
     args = parser.parse_args()
 
+    if args.reextract:
+        run_reextract(args)
+        return
+
+    if args.reindex_search:
+        run_reindex_search(args)
+        return
+
+    if args.batch or args.manifest:
+        run_batch(args)
+        return
+
     outdir = Path(args.outdir).expanduser().resolve()
     outdir.mkdir(parents=True, exist_ok=True)
 
+    store = None if args.no_cache else get_store()
+
     # Decide transcript source
-    transcript_text = ""
     source_label = ""
 
     if args.text:
         text_path = Path(args.text).expanduser().resolve()
-        transcript_text = read_text_file(text_path)
+        transcript = read_text_file(text_path)
         source_label = f"text:{text_path.name}"
         base_name = text_path.stem
+        content_sha = file_sha256(text_path)
+        extraction_sha = content_sha
+    elif args.input:
+        media_path = Path(args.input).expanduser().resolve()
+        if not media_path.exists():
+            raise SystemExit(f"Media file not found: {media_path}")
+        print(f"0) Transcribing {media_path.name} ({args.backend}:{args.model}, {args.workers} workers)...")
+        t0 = time.perf_counter()
+        content_sha = file_sha256(media_path)
+        segments, extraction_sha = transcribe_media_cached(media_path, content_sha, args, store)
+        print(f"   {len(segments)} segments in {time.perf_counter() - t0:.1f}s")
+        transcript = Transcript.from_segments(segments)
+        source_label = f"media:{media_path.name}"
+        base_name = media_path.stem
+
+        # Keep the transcript in the --text layout so it can be re-extracted without re-transcribing
+        txt_path = outdir / f"{base_name}.transcript.txt"
+        write_transcript(segments, txt_path)
+        print(f"   transcript: {txt_path}")
     else:
-        raise SystemExit("Missing --text. For YouTube transcripts, run with: --text data/inbox/youtube_transcript.txt")
+        raise SystemExit(
+            "Missing --text or a media input. For YouTube transcripts, run with: "
+            "--text data/inbox/youtube_transcript.txt"
+        )
 
     # Extract
     print(f"1) Loading transcript ({source_label})...")
     print("\n--- TRANSCRIPT PREVIEW (first 500 chars) ---")
-    preview = (transcript_text or "")[:500]
+    preview = transcript.text[:500]
     print(preview if preview else "[empty transcript]")
     print("--- END PREVIEW ---\n")
 
     print("2) Extracting baits from transcript text...")
-    hits = extract_baits(transcript_text, BAIT_DICTIONARY)
+    hits, cached = extract_baits_cached(lambda: transcript, extraction_sha, store)
+    if cached:
+        print("   extraction: cached (transcript and aliases unchanged)")
 
     video_id = args.video_id or base_name
     stamp = datetime.now(UTC).strftime("%Y%m%d_%H%M%S")
@@ -190,26 +593,22 @@ def main():
     # Optional: persist bait hits into SQLite
     inserted = 0
     if not args.no_db:
-        db_hits = [
-            {
-                "bait_name": h.bait,       # canonical bucket (e.g., "crankbait")
-                "bait_text": h.keyword,    # matched phrase
-                "snippet": h.excerpt,      # evidence excerpt
-                "confidence": h.confidence,
-            }
-            for h in hits
-        ]
-
-        if db_hits:
-            try:
-                with connect() as conn:
-                    inserted = insert_bait_hits(conn, video_id, db_hits)
-                    conn.commit()
+        db_hits = hits_to_db(hits)
+
+        # Stored even without hits, so --reextract can rescan it when aliases change
+        try:
+            with connect() as conn:
+                inserted = store_extraction(
+                    conn, video_id, content_sha, source_label, db_hits, transcript
+                )
+                conn.commit()
+            if db_hits:
                 print(f"✅ Inserted {inserted} bait hits into DB for video_id={video_id}")
-            except Exception as e:
-                print(f"⚠️ DB insert failed (continuing, JSON still written): {e}")
-        else:
-            print("ℹ️ No bait hits found; nothing inserted into DB.")
+            else:
+                print("ℹ️ No bait hits found; transcript recorded, nothing inserted into DB.")
+        except Exception as e:
+            clear_bait_cache()  # the with-block rolled back any baits it created
+            print(f"⚠️ DB insert failed (continuing, JSON still written): {e}")
 
     payload = {
         "source": source_label,
@@ -221,6 +620,8 @@ def main():
                 "keyword": h.keyword,
                 "confidence": h.confidence,
                 "excerpt": h.excerpt,
+                "t_start": h.t_start,
+                "t_end": h.t_end,
             }
             for h in hits
         ],
@@ -238,7 +639,8 @@ def main():
     if hits[:10]:
         print("Top hits:")
         for h in hits[:10]:
-            print(f" - {h.bait} ({h.keyword}) conf={h.confidence}")
+            at = f" @ {h.t_start:.0f}s" if h.t_start is not None else ""
+            print(f" - {h.bait} ({h.keyword}) conf={h.confidence}{at}")
 
 
 if __name__ == "__main__":
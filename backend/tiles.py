@@ -0,0 +1,265 @@
+# backend/tiles.py
+"""
+Mapbox Vector Tiles (MVT v2) for the ramps and bait-hit layers.
+
+Tiles are encoded here directly (points only, so the protobuf subset is
+tiny). Below CLUSTER_MAX_ZOOM, nearby points are merged on a pixel grid into
+cluster points that carry point_count (and summed hits). Encoded tiles are
+cached on disk under a directory named after the data versions they were
+built from, so any upsert_ramp / create_link / insert_bait_hits simply
+makes the old directory unreachable; it is pruned on the next write.
+"""
+import json
+import math
+import os
+import shutil
+import sqlite3
+import struct
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+
+from db import get_versions, ramps_in_bbox
+
+TILE_CACHE_DIR = Path(os.getenv("RAYBURN_TILE_CACHE_DIR", os.path.join("data", "tiles")))
+TILE_EXTENT = 4096
+TILE_BUFFER = 64  # extent units kept around the tile edge so clusters/labels don't clip
+MAX_ZOOM = 22
+CLUSTER_MAX_ZOOM = int(os.getenv("RAYBURN_TILE_CLUSTER_MAX_ZOOM", "12"))
+CLUSTER_RADIUS_PX = 40
+
+# layer name -> data_versions rows the layer is derived from
+LAYERS: Dict[str, Tuple[str, ...]] = {
+    "ramps": ("ramps",),
+    "bait_hits": ("ramps", "links", "bait_hits"),
+}
+
+
+# -------------------------
+# Minimal protobuf / MVT encoding
+# -------------------------
+def _varint(n: int) -> bytes:
+    out = bytearray()
+    while True:
+        b = n & 0x7F
+        n >>= 7
+        if n:
+            out.append(b | 0x80)
+        else:
+            out.append(b)
+            return bytes(out)
+
+
+def _zigzag(n: int) -> int:
+    return (n << 1) ^ (n >> 63)
+
+
+def _field(num: int, wire: int) -> bytes:
+    return _varint((num << 3) | wire)
+
+
+def _bytes_field(num: int, payload: bytes) -> bytes:
+    return _field(num, 2) + _varint(len(payload)) + payload
+
+
+def _packed(num: int, values: Iterable[int]) -> bytes:
+    return _bytes_field(num, b"".join(_varint(v) for v in values))
+
+
+def _value(v: Any) -> bytes:
+    if isinstance(v, bool):
+        return _field(7, 0) + _varint(int(v))
+    if isinstance(v, int):
+        return _field(6, 0) + _varint(_zigzag(v)) if v < 0 else _field(5, 0) + _varint(v)
+    if isinstance(v, float):
+        return _field(3, 1) + struct.pack("<d", v)
+    return _bytes_field(1, str(v).encode("utf-8"))
+
+
+def encode_layer(name: str, features: List[Dict[str, Any]]) -> bytes:
+    """features: [{"x": int, "y": int, "properties": {...}}] in tile coords."""
+    keys: Dict[str, int] = {}
+    values: Dict[Tuple[type, Any], int] = {}
+    body = bytearray()
+
+    for f in features:
+        tags: List[int] = []
+        for k, v in f["properties"].items():
+            if v is None:
+                continue
+            tags.append(keys.setdefault(k, len(keys)))
+            tags.append(values.setdefault((type(v), v), len(values)))
+
+        feat = bytearray()
+        if tags:
+            feat += _packed(2, tags)
+        feat += _field(3, 0) + _varint(1)  # GeomType POINT
+        # MoveTo(count=1), then zigzag-encoded x/y
+        feat += _packed(4, (9, _zigzag(f["x"]), _zigzag(f["y"])))
+        body += _bytes_field(2, bytes(feat))
+
+    layer = bytearray()
+    layer += _field(15, 0) + _varint(2)
+    layer += _bytes_field(1, name.encode("utf-8"))
+    layer += body
+    for k in keys:
+        layer += _bytes_field(3, k.encode("utf-8"))
+    for _t, v in values:
+        layer += _bytes_field(4, _value(v))
+    layer += _field(5, 0) + _varint(TILE_EXTENT)
+    return _bytes_field(3, bytes(layer))
+
+
+# -------------------------
+# Web Mercator tile math
+# -------------------------
+def tile_bbox(z: int, x: int, y: int, buffer: float = 0.0) -> Tuple[float, float, float, float]:
+    """(min_lng, min_lat, max_lng, max_lat) of a tile, grown by `buffer` tile widths."""
+    n = 2 ** z
+
+    def lng(tx: float) -> float:
+        return tx / n * 360.0 - 180.0
+
+    def lat(ty: float) -> float:
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * ty / n))))
+
+    return lng(x - buffer), lat(y + 1 + buffer), lng(x + 1 + buffer), lat(y - buffer)
+
+
+def _to_tile(z: int, x: int, y: int, lat: float, lng: float) -> Tuple[int, int]:
+    n = 2 ** z
+    lat = max(-85.0511, min(85.0511, lat))
+    wx = (lng + 180.0) / 360.0 * n
+    rad = math.radians(lat)
+    wy = (1.0 - math.log(math.tan(rad) + 1.0 / math.cos(rad)) / math.pi) / 2.0 * n
+    return int(round((wx - x) * TILE_EXTENT)), int(round((wy - y) * TILE_EXTENT))
+
+
+def _cluster(points: List[Dict[str, Any]], sum_keys: Tuple[str, ...]) -> List[Dict[str, Any]]:
+    """Grid clustering in tile space; single-member cells keep the original point."""
+    cell = CLUSTER_RADIUS_PX * TILE_EXTENT // 256
+    cells: Dict[Tuple[int, int], List[Dict[str, Any]]] = {}
+    for p in points:
+        cells.setdefault((p["x"] // cell, p["y"] // cell), []).append(p)
+
+    out: List[Dict[str, Any]] = []
+    for members in cells.values():
+        if len(members) == 1:
+            out.append(members[0])
+            continue
+        props: Dict[str, Any] = {"cluster": True, "point_count": len(members)}
+        for k in sum_keys:
+            props[k] = sum(int(m["properties"].get(k) or 0) for m in members)
+        out.append(
+            {
+                "x": sum(m["x"] for m in members) // len(members),
+                "y": sum(m["y"] for m in members) // len(members),
+                "properties": props,
+            }
+        )
+    return out
+
+
+# -------------------------
+# Layer queries
+# -------------------------
+def _ramp_points(conn: sqlite3.Connection, z: int, x: int, y: int) -> List[Dict[str, Any]]:
+    box = tile_bbox(z, x, y, buffer=TILE_BUFFER / TILE_EXTENT)
+    points = []
+    for r in ramps_in_bbox(conn, *box, limit=1_000_000):
+        px, py = _to_tile(z, x, y, r["lat"], r["lng"])
+        points.append(
+            {
+                "x": px,
+                "y": py,
+                "properties": {"ramp_id": r["ramp_id"], "name": r["name"], "ramp_type": r["ramp_type"]},
+            }
+        )
+    return points
+
+
+def _bait_hit_points(conn: sqlite3.Connection, z: int, x: int, y: int) -> List[Dict[str, Any]]:
+    """One point per linked ramp, weighted by the bait hits of the videos linked to it."""
+    ramps = {r["ramp_id"]: r for r in ramps_in_bbox(conn, *tile_bbox(z, x, y, TILE_BUFFER / TILE_EXTENT), 1_000_000)}
+    if not ramps:
+        return []
+
+    rows = conn.execute(
+        """
+        SELECT l.ramp_id, COUNT(bh.hit_id) AS hits, COUNT(DISTINCT bh.video_id) AS videos
+        FROM links l
+        JOIN bait_hits bh ON bh.video_id = l.video_id
+        WHERE l.ramp_id IN (SELECT value FROM json_each(?))
+        GROUP BY l.ramp_id
+        """,
+        (json.dumps(list(ramps)),),
+    ).fetchall()
+
+    points = []
+    for row in rows:
+        r = ramps[row["ramp_id"]]
+        px, py = _to_tile(z, x, y, r["lat"], r["lng"])
+        points.append(
+            {
+                "x": px,
+                "y": py,
+                "properties": {"ramp_id": r["ramp_id"], "hits": int(row["hits"]), "videos": int(row["videos"])},
+            }
+        )
+    return points
+
+
+def build_tile(conn: sqlite3.Connection, layer: str, z: int, x: int, y: int) -> bytes:
+    if layer == "ramps":
+        points, sums = _ramp_points(conn, z, x, y), ()
+    else:
+        points, sums = _bait_hit_points(conn, z, x, y), ("hits", "videos")
+
+    if z < CLUSTER_MAX_ZOOM:
+        points = _cluster(points, sums)
+    return encode_layer(layer, points) if points else b""
+
+
+# -------------------------
+# Disk cache
+# -------------------------
+def _version_token(conn: sqlite3.Connection, layer: str) -> str:
+    return "v" + "-".join(str(v) for v in get_versions(conn, *LAYERS[layer]).values())
+
+
+def _prune_old_versions(layer_dir: Path, keep: str) -> None:
+    for d in layer_dir.iterdir():
+        if d.is_dir() and d.name != keep:
+            shutil.rmtree(d, ignore_errors=True)
+
+
+def get_tile(conn: sqlite3.Connection, layer: str, z: int, x: int, y: int) -> bytes:
+    """Returns the encoded tile (b"" for an empty tile), from the disk cache when current."""
+    if layer not in LAYERS:
+        raise ValueError(f"unknown layer {layer!r}; expected one of {sorted(LAYERS)}")
+    n = 2 ** z
+    if not (0 <= z <= MAX_ZOOM and 0 <= x < n and 0 <= y < n):
+        raise ValueError("tile coordinates out of range")
+
+    # one read snapshot for both the version token and the tile contents
+    if not conn.in_transaction:
+        conn.execute("BEGIN")
+    try:
+        token = _version_token(conn, layer)
+        layer_dir = TILE_CACHE_DIR / layer
+        path = layer_dir / token / str(z) / str(x) / f"{y}.pbf"
+        try:
+            return path.read_bytes()
+        except FileNotFoundError:
+            pass
+        data = build_tile(conn, layer, z, x, y)
+    finally:
+        conn.rollback()
+
+    is_new_version = not (layer_dir / token).exists()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+    if is_new_version:
+        _prune_old_versions(layer_dir, keep=token)
+    return data
@@ -0,0 +1,226 @@
+# backend/transcript.py
+"""
+Timestamp-aware transcripts.
+
+YouTube's "Show transcript" copy alternates cue timestamps (M:SS or H:MM:SS)
+with the caption text that follows them. Transcript keeps only the caption
+text (normalized the same way as baits.normalize_text) plus a compact index
+of cue boundaries: cue i starts at character offset offsets[i] and covers
+[starts[i], ends[i]) seconds. Mapping a match offset back to a time is a
+bisect over that index.
+"""
+from __future__ import annotations
+
+import math
+import re
+from array import array
+from bisect import bisect_right
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from baits import normalize_text
+
+_TS_RE = re.compile(r"^\s*(?:(\d+):)?(\d{1,2}):(\d{2})\s*$")
+_NAN = float("nan")
+
+
+def parse_timestamp(line: str) -> Optional[float]:
+    """'1:02:03' -> 3723.0, '4:05' -> 245.0, anything else -> None."""
+    m = _TS_RE.match(line)
+    if not m:
+        return None
+    h, mnt, sec = m.groups()
+    return int(h or 0) * 3600 + int(mnt) * 60 + int(sec)
+
+
+def _opt(t: float) -> Optional[float]:
+    return None if math.isnan(t) else t
+
+
+class Transcript:
+    __slots__ = ("text", "offsets", "starts", "ends")
+
+    def __init__(self, text: str, offsets: array, starts: array, ends: array):
+        self.text = text
+        self.offsets = offsets  # array('q'): char offset where each cue starts in `text`
+        self.starts = starts  # array('d'): cue start seconds (nan = unknown)
+        self.ends = ends  # array('d'): cue end seconds (nan = unknown)
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    @property
+    def has_times(self) -> bool:
+        return any(not math.isnan(t) for t in self.starts)
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[str]) -> "Transcript":
+        """Streams transcript lines; timestamp lines open a new cue, other lines are its text."""
+        b = _Builder()
+        for line in lines:
+            ts = parse_timestamp(line)
+            if ts is None:
+                b.add_text(line)
+            else:
+                b.mark(ts)
+        return b.finish(ends_from_next_start=True)
+
+    @classmethod
+    def from_text(cls, text: str) -> "Transcript":
+        return cls.from_lines(text.splitlines())
+
+    @classmethod
+    def from_segments(cls, segments: Iterable[Tuple[float, Optional[float], str]]) -> "Transcript":
+        """Builds from already-timed segments, e.g. speech-to-text output: (t_start, t_end, text)."""
+        b = _Builder()
+        for start, end, text in segments:
+            b.mark(start, end)
+            b.add_text(text)
+        return b.finish(ends_from_next_start=False)
+
+    def pack_cues(self) -> bytes:
+        """offsets/starts/ends as one blob (native byte order), for storage next to `text`."""
+        return self.offsets.tobytes() + self.starts.tobytes() + self.ends.tobytes()
+
+    @classmethod
+    def from_packed(cls, text: str, blob: Optional[bytes]) -> "Transcript":
+        """Inverse of pack_cues(). A missing blob gives a single untimed cue."""
+        offsets, starts, ends = array("q"), array("d"), array("d")
+        if blob:
+            n = len(blob) // (offsets.itemsize + starts.itemsize + ends.itemsize)
+            a, b = n * offsets.itemsize, n * (offsets.itemsize + starts.itemsize)
+            offsets.frombytes(blob[:a])
+            starts.frombytes(blob[a:b])
+            ends.frombytes(blob[b:])
+        elif text:
+            offsets.append(0)
+            starts.append(_NAN)
+            ends.append(_NAN)
+        return cls(text, offsets, starts, ends)
+
+    def cue_index(self, offset: int) -> int:
+        return max(0, bisect_right(self.offsets, offset) - 1)
+
+    def span(self, start: int, end: int) -> Tuple[Optional[float], Optional[float]]:
+        """(t_start, t_end) in seconds for the text range [start, end)."""
+        if not self.offsets:
+            return None, None
+        i = self.cue_index(start)
+        j = self.cue_index(max(start, end - 1))
+        t_end = self.ends[j]
+        if math.isnan(t_end):
+            t_end = self.starts[j]
+        return _opt(self.starts[i]), _opt(t_end)
+
+    def cues(self) -> Iterator[Tuple[Optional[float], Optional[float], str]]:
+        """Yields (t_start, t_end, text) per cue."""
+        bounds = list(self.offsets) + [len(self.text) + 1]
+        for i in range(len(self.offsets)):
+            yield _opt(self.starts[i]), _opt(self.ends[i]), self.text[bounds[i] : bounds[i + 1] - 1]
+
+    def segments(self, max_seconds: float = 30.0, max_chars: int = 600) -> Iterator[Tuple[Optional[float], Optional[float], str]]:
+        """
+        Groups consecutive cues into search-sized passages of up to ~max_seconds
+        (or max_chars when there are no times), so phrases that cross a cue
+        boundary still land in one passage.
+        """
+        start: Optional[float] = None
+        end: Optional[float] = None
+        parts: List[str] = []
+        size = 0
+        for t0, t1, text in self.cues():
+            while len(text) > max_chars:  # e.g. an untimed transcript is one huge cue
+                cut = text.rfind(" ", 0, max_chars)
+                cut = cut if cut > 0 else max_chars
+                if parts:
+                    yield start, end, " ".join(parts)
+                    parts, size = [], 0
+                yield t0, t1, text[:cut]
+                text = text[cut:].lstrip()
+            full = parts and (
+                size + len(text) > max_chars
+                or (start is not None and t1 is not None and t1 - start > max_seconds)
+            )
+            if full:
+                yield start, end, " ".join(parts)
+                parts, size = [], 0
+            if not parts:
+                start = t0
+            parts.append(text)
+            size += len(text) + 1
+            end = t1 if t1 is not None else t0
+        if parts:
+            yield start, end, " ".join(parts)
+
+
+class _Builder:
+    def __init__(self) -> None:
+        self.parts: List[str] = []
+        self.pos = 0
+        self.offsets = array("q")
+        self.starts = array("d")
+        self.ends = array("d")
+        self.cur: List[str] = []
+        self.cur_start = _NAN
+        self.cur_end = _NAN
+        self.last_ts = -1.0
+
+    def mark(self, start: float, end: Optional[float] = None) -> None:
+        # Trailing page chrome (e.g. the video length) can follow the last cue;
+        # timestamps that run backwards are not cue boundaries.
+        if start < self.last_ts:
+            return
+        self.last_ts = start
+        self._close()
+        self.cur_start = float(start)
+        self.cur_end = _NAN if end is None else float(end)
+
+    def add_text(self, line: str) -> None:
+        norm = normalize_text(line)
+        if norm:
+            self.cur.append(norm)
+
+    def _close(self) -> None:
+        if not self.cur:
+            return
+        text = " ".join(self.cur)
+        if self.parts:
+            self.pos += 1  # joining space
+        self.offsets.append(self.pos)
+        self.starts.append(self.cur_start)
+        self.ends.append(self.cur_end)
+        self.parts.append(text)
+        self.pos += len(text)
+        self.cur = []
+
+    def finish(self, ends_from_next_start: bool) -> Transcript:
+        self._close()
+        starts, ends = self.starts, self.ends
+        if ends_from_next_start:
+            for i in range(len(starts) - 1):
+                ends[i] = starts[i + 1]
+        # Text before the first timestamp is the start of the video
+        if len(starts) > 1 and math.isnan(starts[0]) and not math.isnan(starts[1]):
+            starts[0] = 0.0
+        return Transcript(" ".join(self.parts), self.offsets, starts, ends)
+
+
+def format_timestamp(seconds: float) -> str:
+    """245.7 -> '4:05', 3723 -> '1:02:03' (inverse of parse_timestamp)."""
+    s = int(seconds)
+    h, rem = divmod(s, 3600)
+    m, sec = divmod(rem, 60)
+    return f"{h}:{m:02d}:{sec:02d}" if h else f"{m}:{sec:02d}"
+
+
+def write_transcript(segments: Iterable[Tuple[float, Optional[float], str]], path: Path) -> None:
+    """Writes segments in the same timestamp/text layout read_transcript() parses."""
+    with open(path, "w", encoding="utf-8") as f:
+        for start, _end, text in segments:
+            f.write(f"{format_timestamp(start)}\n{text}\n")
+
+
+def read_transcript(path: Path) -> Transcript:
+    """Streams a transcript file line by line into a Transcript."""
+    with open(path, encoding="utf-8", errors="ignore") as f:
+        return Transcript.from_lines(f)
@@ -1,5 +1,6 @@
 import os
-import httpx
+
+import http_clients
 
 YT_SEARCH_URL = "https://www.googleapis.com/youtube/v3/search"
 
@@ -19,10 +20,9 @@ async def youtube_search(query: str, max_results: int = 12):
         "key": api_key,
     }
 
-    async with httpx.AsyncClient(timeout=15) as client:
-        r = await client.get(YT_SEARCH_URL, params=params)
-        if r.status_code >= 400:
-            print("YouTube API error status:", r.status_code)
-            print("YouTube API error body:", r.text)
-        r.raise_for_status()
-        return r.json()
+    r = await http_clients.request("youtube", "GET", YT_SEARCH_URL, params=params)
+    if r.status_code >= 400:
+        print("YouTube API error status:", r.status_code)
+        print("YouTube API error body:", r.text)
+    r.raise_for_status()
+    return r.json()
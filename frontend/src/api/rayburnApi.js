@@ -25,12 +25,15 @@ export async function fetchIntelVideos(q = "Sam Rayburn fishing", maxResults = 1
 }
 
 // Line 20
-export async function fetchRamps() {
+// bbox: [minLng, minLat, maxLng, maxLat] to fetch only ramps in view
+export async function fetchRamps(bbox = null, { signal } = {}) {
   // Line 21
-  const url = `${API_BASE}/api/ramps`;
+  const url = bbox
+    ? `${API_BASE}/api/ramps?bbox=${bbox.map((n) => n.toFixed(5)).join(",")}`
+    : `${API_BASE}/api/ramps`;
 
   // Line 23
-  const res = await fetch(url);
+  const res = await fetch(url, { signal });
 
   // Line 25
   if (!res.ok) {
@@ -1,11 +1,12 @@
 // frontend/src/components/RayburnMap.jsx
 
 // Line 1
-import { useEffect, useMemo, useState } from "react";
+import { useCallback, useEffect, useMemo, useRef, useState } from "react";
 // Line 2
-import { MapContainer, TileLayer, Marker, Popup } from "react-leaflet";
+import { MapContainer, TileLayer, Marker, Popup, useMap, useMapEvents } from "react-leaflet";
 // Line 3
 import L from "leaflet";
+import { fetchRamps } from "../api/rayburnApi";
 // Line 4
 
 
@@ -24,21 +25,16 @@ L.Icon.Default.mergeOptions({
   shadowUrl: markerShadow,
 });
 
-// ✅ ArcGIS Feature Layer URL (must end with /0)
-const FEATURE_LAYER_URL =
-  import.meta.env.VITE_RAYBURN_ACCESS_POINTS_LAYER_URL || "";
-
-function buildGeoJsonQueryUrl(layerUrl) {
-  const params = new URLSearchParams({
-    where: "1=1",
-    outFields: "*",
-    outSR: "4326",
-    f: "geojson",
-  });
-  return `${layerUrl}/query?${params.toString()}`;
+// Reports the visible bounds on mount and after every pan/zoom
+function ViewportWatcher({ onChange }) {
+  const map = useMap();
+  useMapEvents({ moveend: () => onChange(map.getBounds()) });
+  useEffect(() => {
+    onChange(map.getBounds());
+  }, [map, onChange]);
+  return null;
 }
 
-
 // Line 20
 export default function RayburnMap({ selectedVideo, onLink }) {
   // Line 21
@@ -53,58 +49,53 @@ export default function RayburnMap({ selectedVideo, onLink }) {
   const center = useMemo(() => [31.28, -94.20], []);
 
   // Line 30
-  useEffect(() => {
-    // Line 31
-    async function loadPoints() {
-      // Line 32
-      setLoading(true);
-      // Line 33
-      setErr("");
-
-      try {
-        // Line 36
-        // ✅ Pull GeoJSON from your backend: http://127.0.0.1:8000/api/ramps
-        if (!FEATURE_LAYER_URL) {
-          setErr("Missing VITE_RAYBURN_ACCESS_POINTS_LAYER_URL in frontend/.env.local");
-return;
-}
-
-const url = buildGeoJsonQueryUrl(FEATURE_LAYER_URL);
-const res = await fetch(url);
-if (!res.ok) throw new Error(`ArcGIS query failed: ${res.status}`);
-const geo = await res.json();
-
-
-        // Line 40
-        const features = (geo.features || []).map((f) => {
-          const [lng, lat] = f.geometry.coordinates;
-          return {
-            id: f.properties?.OBJECTID ?? crypto.randomUUID(),
-            name:
-              f.properties?.Name ||
-              f.properties?.NAME ||
-              f.properties?.Title ||
-              "Access Point",
-            type: f.properties?.Type || f.properties?.TYPE || "",
-            lat,
-            lng,
-            raw: f.properties,
-          };
-        });
-
-        // Line 57
-        setPoints(features);
-      } catch (e) {
-        // Line 59
-        setErr(e?.message || "Failed to load access points.");
-      } finally {
-        // Line 62
-        setLoading(false);
-      }
+  // Only fetch the ramps inside the current viewport; abort stale requests
+  const inflight = useRef(null);
+
+  const loadPoints = useCallback(async (bounds) => {
+    inflight.current?.abort();
+    const controller = new AbortController();
+    inflight.current = controller;
+
+    // Line 32
+    setLoading(true);
+    // Line 33
+    setErr("");
+
+    try {
+      // Line 36
+      // ✅ Pull GeoJSON from your backend: http://127.0.0.1:8000/api/ramps?bbox=...
+      // (served from the backend's local ramp store, synced from ArcGIS)
+      const bbox = [bounds.getWest(), bounds.getSouth(), bounds.getEast(), bounds.getNorth()];
+      const geo = await fetchRamps(bbox, { signal: controller.signal });
+
+      // Line 40
+      const features = (geo.features || []).map((f) => {
+        const [lng, lat] = f.geometry.coordinates;
+        return {
+          id: f.properties?.OBJECTID ?? crypto.randomUUID(),
+          name:
+            f.properties?.Name ||
+            f.properties?.NAME ||
+            f.properties?.Title ||
+            "Access Point",
+          type: f.properties?.Type || f.properties?.TYPE || "",
+          lat,
+          lng,
+          raw: f.properties,
+        };
+      });
+
+      // Line 57
+      setPoints(features);
+    } catch (e) {
+      if (e?.name === "AbortError") return;
+      // Line 59
+      setErr(e?.message || "Failed to load access points.");
+    } finally {
+      // Line 62
+      if (inflight.current === controller) setLoading(false);
     }
-
-    // Line 66
-    loadPoints();
   }, []);
 
   // Line 70
@@ -136,6 +127,8 @@ const geo = await res.json();
               attribution="&copy; OpenStreetMap contributors"
             />
 
+            <ViewportWatcher onChange={loadPoints} />
+
             {points.map((p) => (
               <Marker key={p.id} position={[p.lat, p.lng]}>
                 <Popup>